@@ -25,11 +25,16 @@ Usage:
 """
 
 import argparse
+import hashlib
 import json
+import operator
 import os
 import re
 import sys
 import warnings
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from functools import reduce
 from pathlib import Path
 
 import numpy as np
@@ -52,6 +57,9 @@ LIBRARY_DIR = FUTON3 / "library"
 MANIFEST_PATH = FUTON5 / "resources" / "exotype-program-manifest.edn"
 OUTPUT_EDN = FUTON5 / "resources" / "pattern-exotype-bridge.edn"
 OUTPUT_TSV = FUTON5 / "resources" / "pattern-exotype-bridge.tsv"
+EMBED_CACHE_DIR = FUTON5 / "resources" / ".embed_cache"
+
+MINILM_MODEL = "sentence-transformers/all-MiniLM-L6-v2"
 
 K = 5  # number of nearest anchors
 
@@ -60,25 +68,78 @@ K = 5  # number of nearest anchors
 # Step 1: Load and join anchor data
 # ---------------------------------------------------------------------------
 
+@dataclass
+class Embeddings:
+    """MiniLM pattern embeddings, one row per pattern in a single float32 matrix.
+
+    Also reads as the {pattern_id: {"title": str, "vector": np.array}}
+    mapping used throughout; each "vector" is a row view into V, and rows()
+    gathers several patterns' vectors in one indexing operation.
+    """
+    ids: list
+    titles: list
+    V: np.ndarray
+    id_to_idx: dict
+
+    @classmethod
+    def from_entries(cls, entries):
+        """Build from [{"id", "title", "vector"}, ...]; a repeated id keeps its
+        first position and takes the later values."""
+        dim = len(entries[0]["vector"]) if entries else 0
+        V = np.empty((len(entries), dim), dtype=np.float32)
+        ids, titles, id_to_idx = [], [], {}
+        for entry in entries:
+            i = id_to_idx.get(entry["id"])
+            if i is None:
+                i = id_to_idx[entry["id"]] = len(ids)
+                ids.append(entry["id"])
+                titles.append(entry["title"])
+            else:
+                titles[i] = entry["title"]
+            V[i] = entry["vector"]
+        return cls(ids, titles, V[:len(ids)], id_to_idx)
+
+    def rows(self, pids):
+        """(len(pids), D) matrix of the given patterns' vectors."""
+        return self.V[[self.id_to_idx[pid] for pid in pids]]
+
+    def __len__(self):
+        return len(self.ids)
+
+    def __iter__(self):
+        return iter(self.ids)
+
+    def __contains__(self, pid):
+        return pid in self.id_to_idx
+
+    def __getitem__(self, pid):
+        i = self.id_to_idx[pid]
+        return {"title": self.titles[i], "vector": self.V[i]}
+
+    def keys(self):
+        return list(self.ids)
+
+
 def load_embeddings():
-    """Load MiniLM embeddings: {pattern_id: {title, vector}}"""
+    """Load MiniLM embeddings as an Embeddings matrix (see class docstring)."""
     with open(EMBEDDINGS_PATH) as f:
         data = json.load(f)
-    result = {}
-    for entry in data:
-        result[entry["id"]] = {
-            "title": entry["title"],
-            "vector": np.array(entry["vector"], dtype=np.float32),
-        }
-    return result
+    return Embeddings.from_entries(data)
+
+
+HEX_MMCA_MARKER = "@mmca-interpretation"
+# :bits "XXXXXXXX" inside @mmca-interpretation :sigil-encoding; searched from the marker
+HEX_BITS_RE = re.compile(r':sigil-encoding\s*\{[^}]*:bits\s+"([01]{8})"')
+EXO_BITS_RE = re.compile(r'^@bits\s+([01]{8})', re.MULTILINE)
 
 
 def parse_hexagram_bits(filepath):
     """Extract 8-bit encoding from hexagram flexiarg's @mmca-interpretation section."""
     text = filepath.read_text(encoding="utf-8")
-    # Look for :bits "XXXXXXXX" inside @mmca-interpretation :sigil-encoding
-    m = re.search(r'@mmca-interpretation.*?:sigil-encoding\s*\{[^}]*:bits\s+"([01]{8})"',
-                  text, re.DOTALL)
+    start = text.find(HEX_MMCA_MARKER)
+    if start < 0:
+        return None
+    m = HEX_BITS_RE.search(text, start + len(HEX_MMCA_MARKER))
     if m:
         return m.group(1)
     return None
@@ -87,12 +148,27 @@ def parse_hexagram_bits(filepath):
 def parse_exotype_bits(filepath):
     """Extract 8-bit encoding from iiching exotype flexiarg's @bits field."""
     text = filepath.read_text(encoding="utf-8")
-    m = re.search(r'^@bits\s+([01]{8})', text, re.MULTILINE)
+    m = EXO_BITS_RE.search(text)
     if m:
         return m.group(1)
     return None
 
 
+def _scan_bits(anchors, embeddings, directory, glob, namespace, parse_bits, source):
+    """Add every flexiarg in directory matching glob that has bits and an embedding."""
+    for fpath in sorted(directory.glob(glob)):
+        pattern_id = f"{namespace}/{fpath.stem}"
+        if pattern_id not in embeddings:
+            continue
+        bits = parse_bits(fpath)
+        if bits:
+            anchors[pattern_id] = {
+                "vector": embeddings[pattern_id]["vector"],
+                "bits": bits,
+                "source": source,
+            }
+
+
 def load_anchors(embeddings):
     """Build anchor set: patterns with both embedding and known 8-bit encoding.
 
@@ -101,26 +177,12 @@ def load_anchors(embeddings):
     anchors = {}
 
     # Hexagrams: 64 patterns
-    for fpath in sorted(HEXAGRAM_DIR.glob("hexagram-*.flexiarg")):
-        pattern_id = f"iching/{fpath.stem}"
-        bits = parse_hexagram_bits(fpath)
-        if bits and pattern_id in embeddings:
-            anchors[pattern_id] = {
-                "vector": embeddings[pattern_id]["vector"],
-                "bits": bits,
-                "source": "hexagram",
-            }
+    _scan_bits(anchors, embeddings, HEXAGRAM_DIR, "hexagram-*.flexiarg",
+               "iching", parse_hexagram_bits, "hexagram")
 
     # Exotypes: 256 patterns
-    for fpath in sorted(EXOTYPE_DIR.glob("exotype-[0-9]*.flexiarg")):
-        pattern_id = f"iiching/{fpath.stem}"
-        bits = parse_exotype_bits(fpath)
-        if bits and pattern_id in embeddings:
-            anchors[pattern_id] = {
-                "vector": embeddings[pattern_id]["vector"],
-                "bits": bits,
-                "source": "exotype",
-            }
+    _scan_bits(anchors, embeddings, EXOTYPE_DIR, "exotype-[0-9]*.flexiarg",
+               "iiching", parse_exotype_bits, "exotype")
 
     return anchors
 
@@ -131,21 +193,47 @@ def load_anchors(embeddings):
 
 def bits_to_array(bits_str):
     """Convert '01101010' to numpy array [0, 1, 1, 0, 1, 0, 1, 0]."""
-    return np.array([int(b) for b in bits_str], dtype=np.float32)
+    return (np.frombuffer(bits_str.encode("ascii"), dtype=np.uint8) - ord("0")).astype(np.float32)
+
+
+def bits_matrix(bits_strs):
+    """Stack equal-length bit strings into an (N, L) float32 array in one pass."""
+    bits_strs = list(bits_strs)
+    if not bits_strs:
+        return np.zeros((0, 8), dtype=np.float32)
+    flat = np.frombuffer("".join(bits_strs).encode("ascii"), dtype=np.uint8)
+    return (flat.reshape(len(bits_strs), -1) - ord("0")).astype(np.float32)
 
 
 def array_to_bits(arr):
     """Quantize float array to binary string via rounding."""
-    return "".join(str(int(round(max(0.0, min(1.0, v))))) for v in arr)
+    quantized = np.round(np.clip(np.asarray(arr, dtype=np.float64), 0.0, 1.0)).astype(np.uint8)
+    return (quantized + ord("0")).tobytes().decode("ascii")
+
+
+def matrix_to_bits(bits):
+    """Convert an (N, L) 0/1 array to N bit strings in one byte-encoding pass."""
+    codes = np.ascontiguousarray(bits, dtype=np.uint8) + ord("0")
+    return codes.view(f"S{codes.shape[1]}").ravel().astype(str).tolist()
 
 
 def cosine_similarity(a, b):
     """Cosine similarity between two vectors."""
-    dot = np.dot(a, b)
-    norm = np.linalg.norm(a) * np.linalg.norm(b)
-    if norm < 1e-10:
+    # One sqrt over the product of squared norms (threshold is 1e-10 squared)
+    denom = np.vdot(a, a) * np.vdot(b, b)
+    if denom < 1e-20:
         return 0.0
-    return float(dot / norm)
+    return float(np.dot(a, b) / np.sqrt(denom))
+
+
+def normalize_rows(X):
+    """L2-normalize the rows of X; near-zero rows stay near zero.
+
+    Row norms come from a single einsum sum-of-squares pass, with no
+    squared temporary and no norm-type dispatch.
+    """
+    norms = np.sqrt(np.einsum("ij,ij->i", X, X))
+    return X / (norms[:, None] + 1e-10)
 
 
 def cosine_similarity_matrix(queries, keys):
@@ -155,68 +243,128 @@ def cosine_similarity_matrix(queries, keys):
     keys: (M, D)
     returns: (N, M) similarity matrix
     """
-    q_norm = queries / (np.linalg.norm(queries, axis=1, keepdims=True) + 1e-10)
-    k_norm = keys / (np.linalg.norm(keys, axis=1, keepdims=True) + 1e-10)
-    return q_norm @ k_norm.T
+    queries = np.asarray(queries, dtype=np.float32)
+    keys = np.asarray(keys, dtype=np.float32)
+    return normalize_rows(queries) @ normalize_rows(keys).T
+
+
+def top_k_indices(sims, k):
+    """Indices of the k largest entries along the last axis, most similar first.
+
+    argpartition selects the winners in O(A); only those k are then sorted.
+    """
+    k = min(k, sims.shape[-1])
+    part = np.argpartition(-sims, k - 1, axis=-1)[..., :k]
+    order = np.argsort(-np.take_along_axis(sims, part, axis=-1), axis=-1)
+    return np.take_along_axis(part, order, axis=-1)
+
+
+@dataclass
+class AnchorIndex:
+    """Anchor set prepared once for repeated similarity queries.
+
+    ids: anchor pattern IDs, in row order
+    V:   (A, D) anchor vectors
+    Vn:  (A, D) L2-normalized anchor vectors (cosine == dot product)
+    B:   (A, 8) anchor bit encodings as float32
+    """
+    ids: list
+    V: np.ndarray
+    Vn: np.ndarray
+    B: np.ndarray
+
+    @classmethod
+    def build(cls, ids, V, B):
+        """Build an index from parallel ids / vector rows / bit rows."""
+        V = np.asarray(V, dtype=np.float32)
+        return cls(list(ids), V, normalize_rows(V), np.asarray(B, dtype=np.float32))
+
+    @classmethod
+    def from_anchors(cls, anchors):
+        """Build an index from an anchors dict as returned by load_anchors."""
+        ids = list(anchors.keys())
+        V = np.array([anchors[aid]["vector"] for aid in ids])
+        return cls.build(ids, V, bits_matrix(anchors[aid]["bits"] for aid in ids))
+
+    def subset(self, mask):
+        """Index over the rows selected by a boolean mask, without re-normalizing."""
+        ids = [aid for aid, keep in zip(self.ids, mask) if keep]
+        return AnchorIndex(ids, self.V[mask], self.Vn[mask], self.B[mask])
+
+    def similarities(self, queries):
+        """Cosine similarity of (N, D) queries against every anchor → (N, A).
+
+        Queries are cast to float32 so the product always runs as sgemm.
+        """
+        return normalize_rows(np.asarray(queries, dtype=np.float32)) @ self.Vn.T
 
 
-def knn_project(query_vector, anchor_ids, anchor_vectors, anchor_bits_arrays, k=K):
+def knn_project(query_vector, index, k=K):
     """Project a query vector to 8-bit encoding via k-NN weighted average.
 
     Returns (bits_str, nearest_list, confidence).
     """
-    # Compute similarities
-    sims = np.array([cosine_similarity(query_vector, av) for av in anchor_vectors])
+    return knn_project_batch(np.asarray(query_vector).reshape(1, -1), index, k=k)[0]
 
-    # Top-K
-    top_k_idx = np.argsort(sims)[-k:][::-1]
-    top_k_sims = sims[top_k_idx]
 
-    # Weighted average of bit encodings
-    weights = np.maximum(top_k_sims, 0.0)
-    weight_sum = weights.sum()
-    if weight_sum < 1e-10:
-        weights = np.ones(k) / k
-    else:
-        weights = weights / weight_sum
+def knn_project_batch(query_vectors, index, k=K):
+    """Project a batch of query vectors to 8-bit encodings via k-NN weighted average.
 
-    weighted_bits = np.zeros(8, dtype=np.float32)
-    for i, idx in enumerate(top_k_idx):
-        weighted_bits += weights[i] * anchor_bits_arrays[idx]
+    Computes all query/anchor similarities with one matrix product instead
+    of a per-pair loop.
 
-    bits_str = array_to_bits(weighted_bits)
-    confidence = float(np.mean(top_k_sims))
-
-    nearest = []
-    for idx in top_k_idx:
-        nearest.append({
-            "id": anchor_ids[idx],
-            "similarity": round(float(sims[idx]), 4),
-        })
+    query_vectors: (N, D)
+    index: AnchorIndex of the anchors to vote
+    Returns list of (bits_str, nearest_list, confidence), one per query row.
+    """
+    sims = index.similarities(query_vectors)
+    top_k_idx = top_k_indices(sims, k)
+    top_k_sims = np.take_along_axis(sims, top_k_idx, axis=1)
+    k = top_k_idx.shape[1]
 
-    return bits_str, nearest, confidence
+    # Weighted average of bit encodings (uniform where all weights vanish)
+    weights = np.maximum(top_k_sims, 0.0)
+    weight_sum = weights.sum(axis=1, keepdims=True)
+    weights = np.where(weight_sum < 1e-10, 1.0 / k, weights / np.maximum(weight_sum, 1e-10))
+    weighted_bits = np.einsum("nk,nkb->nb", weights, index.B[top_k_idx])
+    bits_strs = matrix_to_bits(np.round(np.clip(weighted_bits, 0.0, 1.0)))
+    confidences = top_k_sims.mean(axis=1).tolist()
+
+    # Only dict assembly stays per row, over plain Python lists
+    anchor_ids = index.ids
+    results = []
+    for bits_str, idx_row, sim_row, confidence in zip(
+            bits_strs, top_k_idx.tolist(), top_k_sims.tolist(), confidences):
+        nearest = [
+            {"id": anchor_ids[idx], "similarity": round(sim, 4)}
+            for idx, sim in zip(idx_row, sim_row)
+        ]
+        results.append((bits_str, nearest, confidence))
+    return results
 
 
-def project_all_patterns(embeddings, anchors):
+def project_all_patterns(embeddings, anchors, index=None):
     """Project all non-anchor patterns to 8-bit encodings.
 
+    Pass a prebuilt AnchorIndex to reuse it across calls.
+
     Returns dict: {pattern_id: {"exotype_8bit": str, "nearest": list, "confidence": float}}
     """
-    # Prepare anchor arrays
-    anchor_ids = list(anchors.keys())
-    anchor_vectors = np.array([anchors[aid]["vector"] for aid in anchor_ids])
-    anchor_bits_arrays = np.array([bits_to_array(anchors[aid]["bits"]) for aid in anchor_ids])
+    if index is None:
+        index = AnchorIndex.from_anchors(anchors)
+    anchor_ids = index.ids
 
     results = {}
 
-    # Anchors keep their own encoding
-    for aid in anchor_ids:
-        # Still compute nearest for display, but bits are ground truth
-        sims = np.array([cosine_similarity(anchors[aid]["vector"], av) for av in anchor_vectors])
-        top_k_idx = np.argsort(sims)[-K - 1:][::-1]
+    # Anchors keep their own encoding; nearest is for display only and
+    # reuses the normalized anchor matrix
+    anchor_sims = index.Vn @ index.Vn.T
+    anchor_top_idx = top_k_indices(anchor_sims, K + 1)
+    for i, aid in enumerate(anchor_ids):
+        sims = anchor_sims[i]
         # Skip self
         nearest = []
-        for idx in top_k_idx:
+        for idx in anchor_top_idx[i]:
             if anchor_ids[idx] != aid:
                 nearest.append({
                     "id": anchor_ids[idx],
@@ -232,12 +380,13 @@ def project_all_patterns(embeddings, anchors):
             "is_anchor": True,
         }
 
-    # Non-anchors: project via k-NN
-    non_anchors = {pid: emb for pid, emb in embeddings.items() if pid not in anchors}
-    for pid, emb in non_anchors.items():
-        bits_str, nearest, confidence = knn_project(
-            emb["vector"], anchor_ids, anchor_vectors, anchor_bits_arrays
-        )
+    # Non-anchors: project via k-NN, all queries in one batch
+    non_anchor_ids = [pid for pid in embeddings if pid not in anchors]
+    if not non_anchor_ids:
+        return results
+    query_vectors = embeddings.rows(non_anchor_ids)
+    projected = knn_project_batch(query_vectors, index)
+    for pid, (bits_str, nearest, confidence) in zip(non_anchor_ids, projected):
         results[pid] = {
             "exotype_8bit": bits_str,
             "nearest": nearest,
@@ -258,15 +407,22 @@ class RidgeProjector:
     Treats bit prediction as regression (output in [0,1]), then thresholds.
     PCA handles the 384 >> N dimensionality gap, concentrating signal
     into fewer components before ridge fits.
+
+    Solved in closed form from one thin SVD of the standardized inputs: the
+    same factorization gives the PCA components, the exact leave-one-out
+    error for every alpha in the grid, and the final coefficients.
     """
 
+    ALPHAS = np.logspace(-3, 3, 20)
+
     def __init__(self, use_pca=True, n_components=32):
         self.use_pca = use_pca
         self.n_components = n_components
-        self.pca = None
-        self.ridge = None
+        self.alpha = None
+        self.coef = None
         self.X_mean = None
         self.X_std = None
+        self.Y_mean = None
 
     def fit(self, X, Y):
         """Fit PCA + multi-output ridge regression.
@@ -274,32 +430,35 @@ class RidgeProjector:
         X: (N, 384) embedding vectors
         Y: (N, 8) binary targets
         """
-        from sklearn.decomposition import PCA
-        from sklearn.linear_model import RidgeCV
-
         # Standardize
         self.X_mean = X.mean(axis=0)
         self.X_std = X.std(axis=0) + 1e-8
         X_scaled = (X - self.X_mean) / self.X_std
+        self.Y_mean = Y.mean(axis=0)
+        Y_centered = Y - self.Y_mean
 
+        U, s, Vt = np.linalg.svd(X_scaled, full_matrices=False)
         if self.use_pca:
             n_comp = min(self.n_components, X.shape[0] - 1, X.shape[1])
-            self.pca = PCA(n_components=n_comp)
-            X_proj = self.pca.fit_transform(X_scaled)
-        else:
-            X_proj = X_scaled
+            U, s, Vt = U[:, :n_comp], s[:n_comp], Vt[:n_comp]
 
-        self.ridge = RidgeCV(alphas=np.logspace(-3, 3, 20), cv=5)
-        self.ridge.fit(X_proj, Y)
+        # Leave-one-out error for all alphas at once via the hat-matrix diagonal
+        n = X.shape[0]
+        s2 = s ** 2
+        UtY = U.T @ Y_centered                                  # (r, 8)
+        shrink = s2 / (s2 + self.ALPHAS[:, None])               # (A, r)
+        fitted = np.einsum("nr,ar,rk->ank", U, shrink, UtY)     # (A, N, 8)
+        leverage = (U ** 2) @ shrink.T + 1.0 / n                # (N, A), incl. intercept
+        resid = (Y_centered - fitted) / np.maximum(1.0 - leverage.T, 1e-12)[:, :, None]
+        self.alpha = float(self.ALPHAS[np.argmin((resid ** 2).mean(axis=(1, 2)))])
+
+        # W = V diag(s / (s^2 + alpha)) U^T Y, in standardized input space
+        self.coef = (Vt.T * (s / (s2 + self.alpha))) @ UtY
 
     def predict_proba(self, X):
         """Predict continuous values for each bit. Returns (N, 8) clipped to [0,1]."""
         X_scaled = (X - self.X_mean) / self.X_std
-        if self.use_pca:
-            X_proj = self.pca.transform(X_scaled)
-        else:
-            X_proj = X_scaled
-        raw = self.ridge.predict(X_proj)
+        raw = X_scaled @ self.coef + self.Y_mean
         return np.clip(raw, 0, 1).astype(np.float32)
 
     def predict_bits(self, X):
@@ -309,7 +468,11 @@ class RidgeProjector:
 
 
 class MLPProjector:
-    """Small MLP: 384 → 64 → 8, trained with BCE loss."""
+    """Small MLP: 384 → 64 → 8, trained with BCE loss.
+
+    The network emits logits; sigmoid is fused into the loss during training
+    (BCEWithLogitsLoss) and applied once at prediction time.
+    """
 
     def __init__(self):
         self.model = None
@@ -320,25 +483,28 @@ class MLPProjector:
         import torch.nn as nn
 
         self.device = "cpu"
-        X_t = torch.tensor(X, dtype=torch.float32, device=self.device)
-        Y_t = torch.tensor(Y, dtype=torch.float32, device=self.device)
+        X_t = torch.as_tensor(X, dtype=torch.float32, device=self.device)
+        Y_t = torch.as_tensor(Y, dtype=torch.float32, device=self.device)
 
         self.model = nn.Sequential(
             nn.Linear(384, 64),
             nn.ReLU(),
             nn.Dropout(0.3),
             nn.Linear(64, 8),
-            nn.Sigmoid(),
         ).to(self.device)
 
-        optimizer = torch.optim.Adam(self.model.parameters(), lr=lr, weight_decay=weight_decay)
-        criterion = nn.BCELoss()
+        try:
+            optimizer = torch.optim.Adam(self.model.parameters(), lr=lr,
+                                         weight_decay=weight_decay, fused=True)
+        except (RuntimeError, TypeError):
+            # Older torch builds have no fused Adam on CPU
+            optimizer = torch.optim.Adam(self.model.parameters(), lr=lr, weight_decay=weight_decay)
+        criterion = nn.BCEWithLogitsLoss()
 
         self.model.train()
         for epoch in range(epochs):
-            optimizer.zero_grad()
-            pred = self.model(X_t)
-            loss = criterion(pred, Y_t)
+            optimizer.zero_grad(set_to_none=True)
+            loss = criterion(self.model(X_t), Y_t)
             loss.backward()
             optimizer.step()
 
@@ -346,8 +512,8 @@ class MLPProjector:
         import torch
         self.model.eval()
         with torch.no_grad():
-            X_t = torch.tensor(X, dtype=torch.float32, device=self.device)
-            probs = self.model(X_t).cpu().numpy()
+            X_t = torch.as_tensor(X, dtype=torch.float32, device=self.device)
+            probs = torch.sigmoid(self.model(X_t)).cpu().numpy()
         return probs
 
     def predict_bits(self, X):
@@ -359,8 +525,12 @@ def train_projector(method, anchors):
     """Train a projector on anchor data. Returns the fitted projector."""
     anchor_ids = list(anchors.keys())
     X = np.array([anchors[aid]["vector"] for aid in anchor_ids])
-    Y = np.array([bits_to_array(anchors[aid]["bits"]) for aid in anchor_ids])
+    Y = bits_matrix(anchors[aid]["bits"] for aid in anchor_ids)
+    return fit_projector(method, X, Y)
 
+
+def fit_projector(method, X, Y):
+    """Fit a projector of the given method on (N, D) vectors and (N, 8) bits."""
     if method == "ridge":
         proj = RidgeProjector()
         proj.fit(X, Y)
@@ -373,26 +543,36 @@ def train_projector(method, anchors):
     return proj
 
 
-def project_all_patterns_ml(embeddings, anchors, projector):
+def project_all_patterns_ml(embeddings, anchors, projector, index=None):
     """Project all patterns using a trained ML projector.
 
+    Pass a prebuilt AnchorIndex to reuse it for the nearest-anchor display.
+
     Returns dict: {pattern_id: {"exotype_8bit": str, "nearest": list, "confidence": float}}
     """
     # Prepare anchor data for nearest-neighbor display
-    anchor_ids = list(anchors.keys())
-    anchor_vectors = np.array([anchors[aid]["vector"] for aid in anchor_ids])
+    if index is None:
+        index = AnchorIndex.from_anchors(anchors)
+    anchor_ids = index.ids
 
     results = {}
 
     # All pattern vectors
-    all_pids = list(embeddings.keys())
-    all_vecs = np.array([embeddings[pid]["vector"] for pid in all_pids])
+    all_pids = embeddings.ids
+    all_vecs = embeddings.V
 
-    # Predict
-    probs, bits_list = projector.predict_bits(all_vecs)
+    # Predict; bit strings and confidences for every row in one pass each.
+    # Confidence: mean probability of predicted bits (how decisive the model is)
+    probs, _ = projector.predict_bits(all_vecs)
+    bits_strs = matrix_to_bits(probs >= 0.5)
+    confidences = np.maximum(probs, 1 - probs).mean(axis=1).tolist()
 
     # Compute nearest anchors for display (batch cosine similarity)
-    sim_matrix = cosine_similarity_matrix(all_vecs, anchor_vectors)
+    sim_matrix = index.similarities(all_vecs)
+    # K + 1 candidates leaves K after an anchor skips itself
+    top_idx = top_k_indices(sim_matrix, K + 1)
+    top_sims = np.take_along_axis(sim_matrix, top_idx, axis=1).tolist()
+    top_idx = top_idx.tolist()
 
     for i, pid in enumerate(all_pids):
         is_anchor = pid in anchors
@@ -400,24 +580,15 @@ def project_all_patterns_ml(embeddings, anchors, projector):
             bits_str = anchors[pid]["bits"]
             confidence = 1.0
         else:
-            bits_str = array_to_bits(bits_list[i])
-            # Confidence: mean probability of predicted bits (how decisive the model is)
-            bit_probs = probs[i]
-            confidence = round(float(np.mean(np.maximum(bit_probs, 1 - bit_probs))), 4)
+            bits_str = bits_strs[i]
+            confidence = round(confidences[i], 4)
 
         # Top-K nearest anchors
-        sims = sim_matrix[i]
-        top_k_idx = np.argsort(sims)[::-1]
-        nearest = []
-        for idx in top_k_idx:
-            if is_anchor and anchor_ids[idx] == pid:
-                continue
-            nearest.append({
-                "id": anchor_ids[idx],
-                "similarity": round(float(sims[idx]), 4),
-            })
-            if len(nearest) >= K:
-                break
+        nearest = [
+            {"id": anchor_ids[idx], "similarity": round(sim, 4)}
+            for idx, sim in zip(top_idx[i], top_sims[i])
+            if not (is_anchor and anchor_ids[idx] == pid)
+        ][:K]
 
         results[pid] = {
             "exotype_8bit": bits_str,
@@ -433,12 +604,33 @@ def project_all_patterns_ml(embeddings, anchors, projector):
 # Step 3: Section-level embedding → 36-bit xenotype
 # ---------------------------------------------------------------------------
 
-SECTION_PATTERN = re.compile(
-    r'^\s+\+\s+(IF|HOWEVER|THEN|BECAUSE)\s*:\s*\n?(.*?)(?=\n\s+\+\s+(?:IF|HOWEVER|THEN|BECAUSE|NEXT-STEPS|evidence)|(?:\n@|\Z))',
-    re.MULTILINE | re.DOTALL | re.IGNORECASE
+# A section runs from its "+ IF:"-style header to the next "+ <section>" /
+# "+ evidence" line, the next "@" line, or end of file. Matching header and
+# stop separately keeps both patterns free of lookahead and lazy-dot
+# backtracking; the stop pattern starts with a literal newline, so the
+# engine skips straight between line breaks.
+SECTION_HEADER_RE = re.compile(
+    r'^\s+\+\s+(IF|HOWEVER|THEN|BECAUSE)\s*:\s*\n?',
+    re.MULTILINE | re.IGNORECASE
+)
+SECTION_STOP_RE = re.compile(
+    r'\n\s+\+\s+(?:IF|HOWEVER|THEN|BECAUSE|NEXT-STEPS|evidence)|\n@',
+    re.IGNORECASE
 )
 
 
+def iter_section_spans(text):
+    """Yield (section_name, raw_text) for each section header in text, in order."""
+    pos = 0
+    while True:
+        header = SECTION_HEADER_RE.search(text, pos)
+        if header is None:
+            return
+        stop = SECTION_STOP_RE.search(text, header.end())
+        pos = stop.start() if stop else len(text)
+        yield header.group(1), text[header.end():pos]
+
+
 def parse_sections(filepath):
     """Extract IF/HOWEVER/THEN/BECAUSE text from a flexiarg file.
 
@@ -448,11 +640,11 @@ def parse_sections(filepath):
     text = filepath.read_text(encoding="utf-8")
     sections = {"IF": None, "HOWEVER": None, "THEN": None, "BECAUSE": None}
 
-    for m in SECTION_PATTERN.finditer(text):
-        key = m.group(1).upper()
+    for name, body in iter_section_spans(text):
+        key = name.upper()
         if key in sections:
             # Clean up the extracted text
-            raw = m.group(2).strip()
+            raw = body.strip()
             # Remove leading indentation and + evidence lines
             lines = []
             for line in raw.split("\n"):
@@ -479,16 +671,68 @@ def load_all_sections(embeddings):
 
     Returns dict: {pattern_id: {"IF": str, "HOWEVER": str, "THEN": str, "BECAUSE": str}}
     """
+    found = [(pid, fpath) for pid, fpath in ((pid, find_flexiarg(pid)) for pid in embeddings)
+             if fpath]
+    paths = [fpath for _, fpath in found]
+
+    # Files parse independently; fan the read + regex work out across processes
+    if (os.cpu_count() or 1) > 1:
+        with ProcessPoolExecutor() as executor:
+            parsed = list(executor.map(parse_sections, paths, chunksize=32))
+    else:
+        parsed = [parse_sections(fpath) for fpath in paths]
+
     all_sections = {}
-    for pid in embeddings:
-        fpath = find_flexiarg(pid)
-        if fpath:
-            sections = parse_sections(fpath)
-            if any(v is not None for v in sections.values()):
-                all_sections[pid] = sections
+    for (pid, _), sections in zip(found, parsed):
+        if any(v is not None for v in sections.values()):
+            all_sections[pid] = sections
     return all_sections
 
 
+_MINILM = None
+
+
+def _minilm():
+    """Load the MiniLM sentence encoder once per process, on CPU."""
+    global _MINILM
+    if _MINILM is None:
+        from sentence_transformers import SentenceTransformer
+        _MINILM = SentenceTransformer(MINILM_MODEL, device="cpu")
+    return _MINILM
+
+
+def encode_cached(texts, **encode_kwargs):
+    """MiniLM encode(texts) backed by an on-disk cache keyed by sha1 of each text.
+
+    Only cache misses are sent through the model, which is not even loaded
+    when every text hits. Vectors are stored as float16 under
+    EMBED_CACHE_DIR/<model>/<sha1>.npy and upcast to float32; fresh
+    encodings take the same round trip so results do not depend on cache
+    state.
+    """
+    cache_dir = EMBED_CACHE_DIR / MINILM_MODEL.replace("/", "__")
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    paths = [cache_dir / f"{hashlib.sha1(t.encode('utf-8')).hexdigest()}.npy" for t in texts]
+
+    vectors = [None] * len(texts)
+    misses = []
+    for i, path in enumerate(paths):
+        if path.exists():
+            vectors[i] = np.load(path).astype(np.float32)
+        else:
+            misses.append(i)
+
+    if misses:
+        print(f"  Embedding cache: {len(texts) - len(misses)} hits, {len(misses)} misses")
+        encoded = _minilm().encode([texts[i] for i in misses], **encode_kwargs)
+        for i, vec in zip(misses, encoded):
+            vec16 = np.asarray(vec, dtype=np.float16)
+            np.save(paths[i], vec16)
+            vectors[i] = vec16.astype(np.float32)
+
+    return np.stack(vectors)
+
+
 def embed_sections(all_sections, embeddings, anchors, method="knn"):
     """Embed section-level text with MiniLM and project each to 8 bits.
 
@@ -500,8 +744,6 @@ def embed_sections(all_sections, embeddings, anchors, method="knn"):
 
     Returns dict: {pattern_id: {"section_bits": {section: str}}}
     """
-    from sentence_transformers import SentenceTransformer
-
     section_names = ["IF", "HOWEVER", "THEN", "BECAUSE"]
     texts_to_embed = {}  # (pid, section) -> text
 
@@ -515,11 +757,9 @@ def embed_sections(all_sections, embeddings, anchors, method="knn"):
 
     # Batch embed all section texts
     print(f"  Embedding {len(texts_to_embed)} section texts with MiniLM...")
-    model = SentenceTransformer("sentence-transformers/all-MiniLM-L6-v2")
-
     keys = list(texts_to_embed.keys())
     texts = [texts_to_embed[k] for k in keys]
-    vectors = model.encode(texts, show_progress_bar=True, batch_size=64)
+    vectors = encode_cached(texts, show_progress_bar=True, batch_size=64)
 
     section_vectors = {}
     for i, k in enumerate(keys):
@@ -540,69 +780,51 @@ def embed_sections(all_sections, embeddings, anchors, method="knn"):
     anchor_section_vectors = {}
     if a_keys:
         a_texts = [anchor_section_texts[k] for k in a_keys]
-        a_vectors = model.encode(a_texts, show_progress_bar=False, batch_size=64)
+        a_vectors = encode_cached(a_texts, show_progress_bar=False, batch_size=64)
         for i, k in enumerate(a_keys):
             anchor_section_vectors[k] = a_vectors[i].astype(np.float32)
 
+    # Per-section anchor pools, indexed once and shared by every query
+    section_indexes = {}
+    for sname in section_names:
+        pool_ids = [aid for aid in anchors if (aid, sname) in anchor_section_vectors]
+        if pool_ids:
+            section_indexes[sname] = AnchorIndex.build(
+                pool_ids,
+                np.array([anchor_section_vectors[(aid, sname)] for aid in pool_ids]),
+                bits_matrix(anchors[aid]["bits"] for aid in pool_ids),
+            )
+
     # For ML methods, train a per-section projector
     section_projectors = {}
     if method in ("ridge", "mlp"):
-        for sname in section_names:
-            pool_vecs = []
-            pool_bits = []
-            for aid in anchors:
-                if (aid, sname) in anchor_section_vectors:
-                    pool_vecs.append(anchor_section_vectors[(aid, sname)])
-                    pool_bits.append(bits_to_array(anchors[aid]["bits"]))
-            if len(pool_vecs) >= 20:  # need minimum samples to train
-                X = np.array(pool_vecs)
-                Y = np.array(pool_bits)
-                if method == "ridge":
-                    proj = RidgeProjector()
-                else:
-                    proj = MLPProjector()
-                proj.fit(X, Y)
-                section_projectors[sname] = proj
+        for sname, pool in section_indexes.items():
+            if len(pool.ids) >= 20:  # need minimum samples to train
+                section_projectors[sname] = fit_projector(method, pool.V, pool.B)
 
-    results = {}
+    results = {pid: {"section_bits": {sname: None for sname in section_names}}
+               for pid in all_sections}
 
-    for pid in all_sections:
-        section_bits = {}
+    # Project each section's queries as one (N, 384) batch
+    for sname in section_names:
+        pids = [pid for pid in all_sections if (pid, sname) in section_vectors]
+        if not pids:
+            continue
+        queries = np.stack([section_vectors[(pid, sname)] for pid in pids])
 
-        for sname in section_names:
-            if (pid, sname) not in section_vectors:
-                section_bits[sname] = None
+        if sname in section_projectors:
+            # ML projection
+            _, bits_list = section_projectors[sname].predict_bits(queries)
+            projected = [array_to_bits(bits) for bits in bits_list]
+        else:
+            # k-NN fallback
+            pool = section_indexes.get(sname)
+            if pool is None or len(pool.ids) < K:
                 continue
+            projected = [bits_str for bits_str, _, _ in knn_project_batch(queries, pool, k=K)]
 
-            query_vec = section_vectors[(pid, sname)]
-
-            if sname in section_projectors:
-                # ML projection
-                probs, bits_list = section_projectors[sname].predict_bits(
-                    query_vec.reshape(1, -1)
-                )
-                section_bits[sname] = array_to_bits(bits_list[0])
-            else:
-                # k-NN fallback
-                pool_ids = []
-                pool_vecs = []
-                pool_bits = []
-                for aid in anchors:
-                    if (aid, sname) in anchor_section_vectors:
-                        pool_ids.append(aid)
-                        pool_vecs.append(anchor_section_vectors[(aid, sname)])
-                        pool_bits.append(bits_to_array(anchors[aid]["bits"]))
-
-                if len(pool_ids) >= K:
-                    bits_str, _, _ = knn_project(
-                        query_vec, pool_ids, np.array(pool_vecs),
-                        np.array(pool_bits), k=K
-                    )
-                    section_bits[sname] = bits_str
-                else:
-                    section_bits[sname] = None
-
-        results[pid] = {"section_bits": section_bits}
+        for pid, bits_str in zip(pids, projected):
+            results[pid]["section_bits"][sname] = bits_str
 
     return results
 
@@ -615,22 +837,15 @@ def assemble_xenotype(exotype_8bit, section_bits):
     Phenotype nibble = XOR of each byte's low 2 bits.
     """
     section_names = ["IF", "HOWEVER", "THEN", "BECAUSE"]
-    bytes_list = []
-
-    for sname in section_names:
-        if section_bits.get(sname):
-            bytes_list.append(section_bits[sname])
-        else:
-            bytes_list.append(exotype_8bit)
+    # Work on packed byte values; render as bit strings only for output
+    byte_vals = [int(section_bits.get(sname) or exotype_8bit, 2) for sname in section_names]
 
     # Phenotype nibble: XOR of each byte's low 2 bits, giving 4*(2 bits) = 8 bits,
     # then take the low 4 bits. Simpler: XOR all 4 bytes, take low nibble.
-    xor_val = 0
-    for b in bytes_list:
-        xor_val ^= int(b, 2)
+    xor_val = reduce(operator.xor, byte_vals)
     phenotype = format(xor_val & 0x0F, "04b")
 
-    xenotype = " ".join(bytes_list) + " " + phenotype
+    xenotype = " ".join(format(b, "08b") for b in byte_vals) + " " + phenotype
     return xenotype
 
 
@@ -643,43 +858,54 @@ def edn_str(s):
     return '"' + s.replace("\\", "\\\\").replace('"', '\\"') + '"'
 
 
+EDN_ENTRY_TMPL = (
+    "  {:pattern-id %s\n"
+    "   :title %s\n"
+    "   :exotype-8bit %s\n"
+    "   :xenotype-36bit %s\n"
+    "   :is-anchor %s\n"
+    "   :confidence %s\n"
+)
+EDN_NEAREST_TMPL = "     {:id %s :similarity %s}\n"
+
+
 def write_edn(results, embeddings, section_data, n_anchors, output_path, method="ridge"):
     """Write the pattern-exotype-bridge.edn file."""
-    lines = []
-    lines.append("{:meta {:generated \"2026-02-16\"")
-    lines.append("        :model \"all-MiniLM-L6-v2\"")
-    lines.append(f"        :method \"{method}\"")
-    lines.append(f"        :n-anchors {n_anchors}")
-    lines.append(f"        :n-patterns {len(results)}")
-    lines.append(f"        :k {K}}}")
-    lines.append(" :patterns")
-    lines.append(" [")
-
-    for pid in sorted(results.keys()):
-        r = results[pid]
-        title = embeddings[pid]["title"]
+    buf = []
+    write = buf.append
+    write("{:meta {:generated \"2026-02-16\"\n"
+          "        :model \"all-MiniLM-L6-v2\"\n"
+          "        :method \"%s\"\n"
+          "        :n-anchors %d\n"
+          "        :n-patterns %d\n"
+          "        :k %d}\n"
+          " :patterns\n"
+          " [\n" % (method, n_anchors, len(results), K))
+
+    for pid, r in sorted(results.items()):
         xenotype = section_data.get(pid, {}).get("xenotype_36bit", r["exotype_8bit"] * 4 + " 0000")
-
-        lines.append(f"  {{:pattern-id {edn_str(pid)}")
-        lines.append(f"   :title {edn_str(title)}")
-        lines.append(f"   :exotype-8bit {edn_str(r['exotype_8bit'])}")
-        lines.append(f"   :xenotype-36bit {edn_str(xenotype)}")
-        lines.append(f"   :is-anchor {str(r.get('is_anchor', False)).lower()}")
-        lines.append(f"   :confidence {r['confidence']}")
+        write(EDN_ENTRY_TMPL % (
+            edn_str(pid),
+            edn_str(embeddings[pid]["title"]),
+            edn_str(r["exotype_8bit"]),
+            edn_str(xenotype),
+            "true" if r.get("is_anchor", False) else "false",
+            r["confidence"],
+        ))
 
         # Nearest hexagrams (limit to K)
         nearest = r.get("nearest", [])[:K]
         if nearest:
-            lines.append("   :nearest-hexagrams [")
+            write("   :nearest-hexagrams [\n")
             for n in nearest:
-                lines.append(f"     {{:id {edn_str(n['id'])} :similarity {n['similarity']}}}")
-            lines.append("   ]")
+                write(EDN_NEAREST_TMPL % (edn_str(n["id"]), n["similarity"]))
+            write("   ]\n")
 
-        lines.append("  }")
+        write("  }\n")
 
-    lines.append(" ]}")
+    write(" ]}")
 
-    output_path.write_text("\n".join(lines), encoding="utf-8")
+    output_path.write_text("".join(buf), encoding="utf-8")
     print(f"Wrote {output_path} ({len(results)} patterns)")
 
 
@@ -691,8 +917,7 @@ def write_tsv(results, embeddings, section_data, output_path):
         "is_anchor", "confidence", "nearest_1", "sim_1", "nearest_2", "sim_2"
     ]))
 
-    for pid in sorted(results.keys()):
-        r = results[pid]
+    for pid, r in sorted(results.items()):
         title = embeddings[pid]["title"]
         xenotype = section_data.get(pid, {}).get("xenotype_36bit", "")
         nearest = r.get("nearest", [])
@@ -716,9 +941,23 @@ def write_tsv(results, embeddings, section_data, output_path):
 # Step 5: Validation
 # ---------------------------------------------------------------------------
 
+POPCOUNT_LUT = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint8)
+
+
+def popcount8(x):
+    """Per-element set-bit count of a uint8 array."""
+    if hasattr(np, "bitwise_count"):  # NumPy >= 2.0
+        return np.bitwise_count(x)
+    return POPCOUNT_LUT[x]
+
+
 def hamming_distance(a, b):
-    """Hamming distance between two bit strings."""
-    return sum(x != y for x, y in zip(a, b))
+    """Hamming distance between two bit strings (or their packed int values)."""
+    if isinstance(a, str):
+        a = int(a, 2)
+    if isinstance(b, str):
+        b = int(b, 2)
+    return (a ^ b).bit_count()
 
 
 def validate_holdout(embeddings, anchors, method="knn", n_folds=10, verbose=True):
@@ -736,16 +975,12 @@ def validate_holdout(embeddings, anchors, method="knn", n_folds=10, verbose=True
         print(f"Held out {len(holdout)} hexagrams, training on {len(train_anchors)} anchors")
 
     if method == "knn":
-        anchor_ids = list(train_anchors.keys())
-        anchor_vectors = np.array([train_anchors[aid]["vector"] for aid in anchor_ids])
-        anchor_bits_arrays = np.array([bits_to_array(train_anchors[aid]["bits"]) for aid in anchor_ids])
+        index = AnchorIndex.from_anchors(train_anchors)
 
         distances = []
         for hid in holdout:
             true_bits = anchors[hid]["bits"]
-            pred_bits, nearest, conf = knn_project(
-                embeddings[hid]["vector"], anchor_ids, anchor_vectors, anchor_bits_arrays
-            )
+            pred_bits, nearest, conf = knn_project(embeddings[hid]["vector"], index)
             dist = hamming_distance(true_bits, pred_bits)
             distances.append(dist)
             if verbose:
@@ -773,8 +1008,11 @@ def validate_holdout(embeddings, anchors, method="knn", n_folds=10, verbose=True
     return mean_dist
 
 
-def validate_holdout_cv(embeddings, anchors, method="knn", n_folds=10):
-    """Full cross-validation over hexagram holdouts."""
+def validate_holdout_cv(embeddings, anchors, method="knn", n_folds=10, index=None):
+    """Full cross-validation over hexagram holdouts.
+
+    Pass a prebuilt AnchorIndex over all anchors to share it across passes.
+    """
     hexagram_ids = [aid for aid in anchors if anchors[aid]["source"] == "hexagram"]
     np.random.seed(42)
     np.random.shuffle(hexagram_ids)
@@ -782,6 +1020,12 @@ def validate_holdout_cv(embeddings, anchors, method="knn", n_folds=10):
     fold_size = max(1, len(hexagram_ids) // n_folds)
     all_distances = []
 
+    # One full anchor index; each fold masks out its holdout rows
+    full_index = index if index is not None else AnchorIndex.from_anchors(anchors)
+    row_of = {aid: i for i, aid in enumerate(full_index.ids)}
+    # Truth as one packed byte per anchor, so scoring is uint8 XOR + popcount
+    true_codes = np.packbits(full_index.B >= 0.5, axis=1).ravel()
+
     for fold in range(n_folds):
         start = fold * fold_size
         end = min(start + fold_size, len(hexagram_ids))
@@ -789,27 +1033,23 @@ def validate_holdout_cv(embeddings, anchors, method="knn", n_folds=10):
         if not holdout:
             continue
 
-        train_anchors = {aid: anchors[aid] for aid in anchors if aid not in holdout}
+        holdout_rows = [row_of[hid] for hid in holdout]
+        train_mask = np.ones(len(full_index.ids), dtype=bool)
+        train_mask[holdout_rows] = False
+
+        # Project the whole holdout as one batch, then score it in bulk
+        queries = embeddings.rows(holdout)
+        true_bits = true_codes[holdout_rows]
 
         if method == "knn":
-            anchor_ids = list(train_anchors.keys())
-            anchor_vectors = np.array([train_anchors[aid]["vector"] for aid in anchor_ids])
-            anchor_bits_arrays = np.array([bits_to_array(train_anchors[aid]["bits"]) for aid in anchor_ids])
-
-            for hid in holdout:
-                true_bits = anchors[hid]["bits"]
-                pred_bits, _, _ = knn_project(
-                    embeddings[hid]["vector"], anchor_ids, anchor_vectors, anchor_bits_arrays
-                )
-                all_distances.append(hamming_distance(true_bits, pred_bits))
+            projected = knn_project_batch(queries, full_index.subset(train_mask))
+            pred_bits = np.array([int(bits_str, 2) for bits_str, _, _ in projected], dtype=np.uint8)
         else:
-            projector = train_projector(method, train_anchors)
-            for hid in holdout:
-                true_bits = anchors[hid]["bits"]
-                vec = embeddings[hid]["vector"].reshape(1, -1)
-                _, bits_list = projector.predict_bits(vec)
-                pred_bits = array_to_bits(bits_list[0])
-                all_distances.append(hamming_distance(true_bits, pred_bits))
+            projector = fit_projector(method, full_index.V[train_mask], full_index.B[train_mask])
+            probs, _ = projector.predict_bits(queries)
+            pred_bits = np.packbits(probs >= 0.5, axis=1).ravel()
+
+        all_distances.extend(popcount8(pred_bits ^ true_bits).tolist())
 
     return np.mean(all_distances), np.std(all_distances)
 
@@ -820,8 +1060,10 @@ def compare_methods(embeddings, anchors):
     print("Method Comparison (10-fold CV over hexagram holdouts)")
     print(f"{'='*60}")
 
+    # Stack vectors and parse bits once for all three CV passes
+    index = AnchorIndex.from_anchors(anchors)
     for method in ["knn", "ridge", "mlp"]:
-        mean_dist, std_dist = validate_holdout_cv(embeddings, anchors, method=method)
+        mean_dist, std_dist = validate_holdout_cv(embeddings, anchors, method=method, index=index)
         bit_acc = 1 - mean_dist / 8
         print(f"  {method:6s}: hamming={mean_dist:.2f}±{std_dist:.2f}  "
               f"bit_acc={bit_acc:.1%}")
@@ -833,29 +1075,29 @@ def validate_domain_coherence(results, embeddings):
     """Check that patterns in the same domain get similar encodings."""
     print(f"\n=== Domain Coherence ===")
 
-    # Group by namespace
-    domains = {}
-    for pid in results:
-        if "/" in pid:
-            ns = pid.split("/")[0]
-            domains.setdefault(ns, []).append(pid)
-
-    for ns in sorted(domains.keys()):
-        pids = domains[ns]
-        if len(pids) < 3:
+    # Pack every exotype once and tag it with its namespace's index
+    pids = [pid for pid in results if "/" in pid]
+    codes = np.array([int(results[pid]["exotype_8bit"], 2) for pid in pids], dtype=np.intp)
+    names, dom_id = np.unique([pid.split("/")[0] for pid in pids], return_inverse=True)
+    if not len(names):
+        return
+
+    # One group-reduce for all domains: histogram each domain's byte codes
+    # (C[d, c] = members of d with code c), then the pairwise hamming total
+    # is sum_ab C[d,a] * popcount(a ^ b) * C[d,b]. Each unordered pair is
+    # counted twice and identical codes contribute zero.
+    C = np.bincount(dom_id.ravel() * 256 + codes,
+                    minlength=len(names) * 256).reshape(len(names), 256)
+    byte = np.arange(256, dtype=np.uint8)
+    H = popcount8(byte[:, None] ^ byte[None, :]).astype(np.int64)
+    totals = ((C @ H) * C).sum(axis=1) // 2
+    counts = C.sum(axis=1)
+
+    for ns, n, total_dist in zip(names.tolist(), counts.tolist(), totals.tolist()):
+        if n < 3:
             continue
-
-        bits_arrays = [bits_to_array(results[pid]["exotype_8bit"]) for pid in pids]
-        # Compute mean pairwise hamming distance within domain
-        total_dist = 0
-        count = 0
-        for i in range(len(bits_arrays)):
-            for j in range(i + 1, len(bits_arrays)):
-                total_dist += np.sum(np.abs(bits_arrays[i] - bits_arrays[j]))
-                count += 1
-        mean_intra = total_dist / max(count, 1)
-
-        print(f"  {ns}: {len(pids)} patterns, mean intra-domain hamming={mean_intra:.2f}")
+        mean_intra = total_dist / (n * (n - 1) // 2)
+        print(f"  {ns}: {n} patterns, mean intra-domain hamming={mean_intra:.2f}")
 
 
 def validate_semantic_sanity(results, embeddings):
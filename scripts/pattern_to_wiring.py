@@ -13,16 +13,35 @@ Works for any pattern in the library:
 Usage:
     python3 scripts/pattern_to_wiring.py iching/hexagram-11-tai
     python3 scripts/pattern_to_wiring.py software-design/adapter-pattern
+    python3 scripts/pattern_to_wiring.py iching/hexagram-01-qian iching/hexagram-02-kun
     python3 scripts/pattern_to_wiring.py --all-hexagrams
     python3 scripts/pattern_to_wiring.py --all
     python3 scripts/pattern_to_wiring.py --stats
+    python3 scripts/pattern_to_wiring.py --all --format json
+
+Standard library only, so large batches can also run under PyPy:
+    pypy3 scripts/pattern_to_wiring.py --all
+(--format json uses orjson when it is installed, else the json module.)
 """
 
 import argparse
+import atexit
 import json
+import os
+import pickle
 import re
 import sys
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache, partial
+from operator import itemgetter
 from pathlib import Path
+from queue import SimpleQueue
+
+try:
+    import orjson  # optional: faster --format json
+except ImportError:
+    orjson = None
 
 CODE_ROOT = Path(__file__).resolve().parent.parent.parent
 FUTON3 = CODE_ROOT / "futon3"
@@ -31,69 +50,148 @@ LIBRARY_DIR = FUTON3 / "library"
 WIRINGS_DIR = FUTON5 / "resources" / "xenotype-wirings"
 BRIDGE_PATH = FUTON5 / "resources" / "pattern-exotype-bridge.edn"
 MANIFEST_PATH = FUTON5 / "resources" / "exotype-program-manifest.edn"
+PARSE_CACHE_PATH = WIRINGS_DIR / ".parse_cache.pkl"
+PARSE_CACHE_VERSION = 1  # bump when parse_flexiarg's output changes
+
+SECTIONS = ["IF", "HOWEVER", "THEN", "BECAUSE"]
+MANIFEST_KEYS = frozenset(["rotation", "match-threshold", "update-prob",
+                           "mix-mode", "invert-on-phenotype?", "mix-shift"])
+
+# Compiled once at import; --all parses hundreds of files with these
+EXOTYPE_PARAMS_OPEN_RE = re.compile(r':exotype-params\s*\{')
+SIGIL_ENCODING_OPEN_RE = re.compile(r':sigil-encoding\s*\{')
+AS_MORPHISM_OPEN_RE = re.compile(r':as-morphism\s*\{')
+SIGIL_BITS_RE = re.compile(r':bits\s+"([01]{8})"')
+BITS_FIELD_RE = re.compile(r'^@bits\s+([01]{8})', re.MULTILINE)
+SECTION_HEADER_RE = re.compile(r'^\s+\+\s+(IF|HOWEVER|THEN|BECAUSE)\s*:',
+                               re.MULTILINE | re.IGNORECASE)
+SECTION_END_RE = re.compile(r'\n\s+\+\s+(?:IF|HOWEVER|THEN|BECAUSE|NEXT-STEPS|evidence)|\n@',
+                            re.IGNORECASE)
+LEADING_SPACE_RE = re.compile(r'\s*')
+MANIFEST_PARAMS_OPEN_RE = re.compile(r':params\s*\{')
+MANIFEST_BITS_RE = re.compile(r':bits\s*"([01]{8})"')
+BRIDGE_PID_RE = re.compile(r'\s+"([^"]+)"')
+BRIDGE_BITS_RE = re.compile(r':exotype-8bit\s+"([01]{8})"')
+BRIDGE_CONF_RE = re.compile(r':confidence\s+([\d.]+)')
 
 
 # ---------------------------------------------------------------------------
 # Parsing
 # ---------------------------------------------------------------------------
 
+_parse_cache = None
+_parse_cache_dirty = False
+_parse_cache_new = {}  # entries parsed by this process, handed back from pool workers
+
+def load_parse_cache():
+    """Load the persistent {path: (mtime_ns, parsed)} cache from disk."""
+    global _parse_cache
+    if _parse_cache is not None:
+        return _parse_cache
+
+    _parse_cache = {}
+    try:
+        with PARSE_CACHE_PATH.open("rb") as f:
+            version, entries = pickle.load(f)
+        if version == PARSE_CACHE_VERSION:
+            _parse_cache = entries
+    except Exception:
+        pass  # missing or unreadable cache: rebuild from scratch
+    atexit.register(save_parse_cache)
+    return _parse_cache
+
+
+def merge_parse_cache(entries):
+    """Fold parse-cache entries made in another process into this one's cache."""
+    global _parse_cache_dirty
+    if entries:
+        load_parse_cache().update(entries)
+        _parse_cache_dirty = True
+
+
+def save_parse_cache():
+    """Write the parse cache back to disk if anything new was parsed."""
+    if not _parse_cache_dirty:
+        return
+    try:
+        PARSE_CACHE_PATH.parent.mkdir(parents=True, exist_ok=True)
+        with PARSE_CACHE_PATH.open("wb") as f:
+            pickle.dump((PARSE_CACHE_VERSION, _parse_cache), f,
+                        protocol=pickle.HIGHEST_PROTOCOL)
+    except OSError as e:
+        print(f"WARNING: could not write {PARSE_CACHE_PATH}: {e}", file=sys.stderr)
+
+
 def parse_flexiarg(filepath):
-    """Parse a flexiarg file into structured data."""
-    text = filepath.read_text(encoding="utf-8")
+    """Parse a flexiarg file, reusing the cached result while its mtime is unchanged."""
+    global _parse_cache_dirty
+    cache = load_parse_cache()
+    key = str(filepath)
+    mtime_ns = filepath.stat().st_mtime_ns
+    entry = cache.get(key)
+    if entry is None or entry[0] != mtime_ns:
+        entry = cache[key] = (mtime_ns, parse_flexiarg_text(filepath.read_text(encoding="utf-8")))
+        _parse_cache_new[key] = entry
+        _parse_cache_dirty = True
+    # Callers annotate the result (resolve_params adds bits), so hand out a copy
+    return dict(entry[1])
+
+
+def parse_flexiarg_text(text):
+    """Parse flexiarg text into structured data."""
     result = {}
 
-    # Top-level @ fields (single-line only — [ \t]+ prevents matching across lines)
-    for m in re.finditer(r'^@(\S+)[ \t]+(.*?)$', text, re.MULTILINE):
-        key, val = m.group(1), m.group(2).strip()
-        result[key] = val
+    # Top-level @ fields: "@key value" on one line, key followed by spaces/tabs
+    for line in text.split("\n"):
+        if line[:1] != "@" or len(line) < 2 or line[1].isspace():
+            continue
+        key = line[1:].split(None, 1)[0]
+        rest = line[1 + len(key):]
+        if rest[:1] in (" ", "\t"):
+            result[key] = rest.strip()
 
     # Exotype params from @mmca-interpretation :exotype-params {…}
-    m = re.search(
-        r':exotype-params\s*\{(.*?)\}',
-        text, re.DOTALL
-    )
-    if m:
-        result["exotype-params"] = parse_edn_map(m.group(1))
+    body = braced_map(text, EXOTYPE_PARAMS_OPEN_RE)
+    if body is not None:
+        result["exotype-params"] = parse_edn_map(body)
 
     # Exotype params from @exotype-params section (iiching files — flat, no braces)
     if "exotype-params" not in result:
-        m = re.search(
-            r'^@exotype-params\s*\n(.*?)(?=\n@|\Z)',
-            text, re.MULTILINE | re.DOTALL
-        )
+        body = field_block(text, "@exotype-params")
+        if body is not None:
+            result["exotype-params"] = parse_edn_map(body)
+
+    # Bits from @mmca-interpretation :sigil-encoding (last :bits in the block)
+    for start, close in iter_braced_blocks(text, SIGIL_ENCODING_OPEN_RE):
+        end = close if close != -1 else len(text)
+        m = None
+        for m in SIGIL_BITS_RE.finditer(text, start, end):
+            pass
         if m:
-            result["exotype-params"] = parse_edn_map(m.group(1))
-
-    # Bits from @mmca-interpretation :sigil-encoding
-    m = re.search(
-        r':sigil-encoding\s*\{[^}]*:bits\s+"([01]{8})"',
-        text, re.DOTALL
-    )
-    if m:
-        result["bits"] = m.group(1)
+            result["bits"] = m.group(1)
+            break
 
     # Bits from @bits (iiching files)
-    m = re.search(r'^@bits\s+([01]{8})', text, re.MULTILINE)
+    m = BITS_FIELD_RE.search(text)
     if m:
         result.setdefault("bits", m.group(1))
 
     # CT interpretation - as-morphism
-    m = re.search(
-        r':as-morphism\s*\{(.*?)\}',
-        text, re.DOTALL
-    )
-    if m:
-        result["ct-morphism"] = parse_edn_map(m.group(1))
+    body = braced_map(text, AS_MORPHISM_OPEN_RE)
+    if body is not None:
+        result["ct-morphism"] = parse_edn_map(body)
 
     # IF/HOWEVER/THEN/BECAUSE sections
-    for section in ["IF", "HOWEVER", "THEN", "BECAUSE"]:
-        pattern = re.compile(
-            rf'^\s+\+\s+{section}\s*:\s*\n?(.*?)(?=\n\s+\+\s+(?:IF|HOWEVER|THEN|BECAUSE|NEXT-STEPS|evidence)|(?:\n@|\Z))',
-            re.MULTILINE | re.DOTALL | re.IGNORECASE
-        )
-        m = pattern.search(text)
-        if m:
-            raw = m.group(1).strip()
+    # One scan finds every section header; each body runs from the first
+    # non-blank after its colon to the next section header, "@" line or EOF
+    headers = {}
+    for m in SECTION_HEADER_RE.finditer(text):
+        headers.setdefault(m.group(1).upper(), m.end())
+    for section in SECTIONS:
+        if section in headers:
+            start = LEADING_SPACE_RE.match(text, headers[section]).end()
+            end = SECTION_END_RE.search(text, start)
+            raw = text[start:end.start() if end else len(text)].strip()
             lines = []
             for line in raw.split("\n"):
                 stripped = line.strip()
@@ -105,88 +203,150 @@ def parse_flexiarg(filepath):
     return result
 
 
+def iter_braced_blocks(text, open_re, start=0):
+    """Yield (open, close) for each block opener (`:key {`) in text from start on.
+
+    open is the index just past the "{"; close is the index of the first
+    "}" after it, or -1 if there is none. The blocks read this way are
+    flat maps, and parse_edn_map flattens anyway, so the first "}" ends
+    the block (a nested map's keys would otherwise leak into the outer one).
+    """
+    for m in open_re.finditer(text, start):
+        yield m.end(), text.find("}", m.end())
+
+
+def braced_map(text, open_re):
+    """Body of the first closed `:key {…}` block in text, or None."""
+    for start, close in iter_braced_blocks(text, open_re):
+        # No "}" after this block means none after any later one either
+        return text[start:close] if close != -1 else None
+    return None
+
+
+def field_block(text, field):
+    """Body of a multi-line "@field" section: its following lines up to the next "@" line."""
+    i = text.find(field)
+    while i != -1:
+        if i == 0 or text[i - 1] == "\n":
+            # The header may carry trailing blanks; the body starts on the
+            # line after the last newline in that run
+            ws_end = LEADING_SPACE_RE.match(text, i + len(field)).end()
+            nl = text.rfind("\n", i + len(field), ws_end)
+            if nl != -1:
+                end = text.find("\n@", nl + 1)
+                return text[nl + 1:end if end != -1 else len(text)]
+        i = text.find(field, i + 1)
+    return None
+
+
 def parse_edn_map(s):
     """Parse a simple EDN map string into a Python dict."""
     result = {}
     # Match :key value pairs
-    for m in re.finditer(r':(\S+)\s+(\S+)', s):
-        key = m.group(1)
-        val = m.group(2)
-        # Parse value types
-        if val in ("true", "false"):
-            result[key] = val == "true"
-        elif val.startswith(":"):
-            result[key] = val
-        elif val.startswith('"'):
-            result[key] = val.strip('"')
-        else:
-            try:
-                result[key] = float(val)
-            except ValueError:
-                result[key] = val
+    for key, val in iter_edn_pairs(s):
+        result[key] = parse_edn_value(val)
     return result
 
 
+def iter_edn_pairs(s):
+    """Yield (key, raw value) for each ":key value" token pair in s.
+
+    Keys are interned: the same few dozen recur in every file, so parsed
+    maps (and the pickled parse cache) share one string object per key.
+    """
+    tokens = iter(s.split())
+    for tok in tokens:
+        # A key is whatever follows the first colon of a token
+        _, colon, key = tok.partition(":")
+        if not colon or not key:
+            continue
+        val = next(tokens, None)
+        if val is None:
+            return
+        yield sys.intern(key), val
+
+
+def parse_edn_value(val):
+    """Coerce one EDN scalar token: boolean, :keyword, "string" or number."""
+    if val in ("true", "false"):
+        return val == "true"
+    elif val.startswith(":"):
+        return sys.intern(val)  # keywords repeat across files, like keys
+    elif val.startswith('"'):
+        return val.strip('"')
+    try:
+        return float(val)
+    except ValueError:
+        return val
+
+
 # ---------------------------------------------------------------------------
 # Manifest and bridge loaders
 # ---------------------------------------------------------------------------
 
-_manifest_cache = None
+_loaded = {}  # "manifest"/"bridge" -> parsed lookup; pool workers get the parent's
 
 def load_manifest_params():
-    """Load the exotype-program-manifest and build bits→params lookup."""
-    global _manifest_cache
-    if _manifest_cache is not None:
-        return _manifest_cache
-
+    """Load the exotype-program-manifest and build bits→params lookup (once)."""
+    if "manifest" in _loaded:
+        return _loaded["manifest"]
     content = MANIFEST_PATH.read_text(encoding="utf-8")
-    _manifest_cache = {}
-
-    for m in re.finditer(
-        r':params\s*\{(.*?)\}.*?:bits\s*"([01]{8})"',
-        content, re.DOTALL
-    ):
-        params_str, bits = m.group(1), m.group(2)
+    manifest = {}
+
+    # Each entry is a flat :params {…} map followed later by its :bits code
+    pos = 0
+    while True:
+        block = next(iter_braced_blocks(content, MANIFEST_PARAMS_OPEN_RE, pos), None)
+        if block is None or block[1] == -1:
+            break
+        start, close = block
+        bm = MANIFEST_BITS_RE.search(content, close + 1)
+        if bm is None:
+            break
+        params_str, bits = content[start:close], bm.group(1)
+        pos = bm.end()
+        # One scan over the params map, keeping only the keys we use
         params = {}
-        for key in ["rotation", "match-threshold", "update-prob",
-                     "mix-mode", "invert-on-phenotype?", "mix-shift"]:
-            km = re.search(rf':{re.escape(key)}\s+(\S+?)(?:,|\s|$)', params_str)
-            if km:
-                val = km.group(1).rstrip(",")
-                if val in ("true", "false"):
-                    params[key] = val == "true"
-                elif val.startswith(":"):
-                    params[key] = val
-                else:
-                    try:
-                        params[key] = float(val)
-                    except ValueError:
-                        params[key] = val
-        _manifest_cache[bits] = params
-
-    return _manifest_cache
-
-
-_bridge_cache = None
+        for key, val in iter_edn_pairs(params_str):
+            if key in MANIFEST_KEYS:
+                params[key] = parse_edn_value(val.rstrip(","))
+        manifest[bits] = params
+
+    _loaded["manifest"] = manifest
+    return manifest
 
-def load_bridge():
-    """Load the pattern-exotype-bridge and return {pattern_id: {exotype_8bit, ...}}."""
-    global _bridge_cache
-    if _bridge_cache is not None:
-        return _bridge_cache
 
+def load_bridge():
+    """Load the pattern-exotype-bridge and return {pattern_id: {exotype_8bit, ...}} (once)."""
+    if "bridge" in _loaded:
+        return _loaded["bridge"]
     content = BRIDGE_PATH.read_text(encoding="utf-8")
-    _bridge_cache = {}
+    bridge = {}
+
+    # Parse pattern entries from the bridge EDN: split once on the entry key,
+    # then each small field regex only scans its own entry
+    for chunk in content.split(":pattern-id")[1:]:
+        pm = BRIDGE_PID_RE.match(chunk)
+        bm = BRIDGE_BITS_RE.search(chunk)
+        cm = BRIDGE_CONF_RE.search(chunk)
+        if pm and bm and cm:
+            bridge[pm.group(1)] = {"exotype_8bit": bm.group(1),
+                                   "confidence": float(cm.group(1))}
 
-    # Parse pattern entries from the bridge EDN
-    for m in re.finditer(
-        r':pattern-id\s+"([^"]+)".*?:exotype-8bit\s+"([01]{8})".*?:confidence\s+([\d.]+)',
-        content, re.DOTALL
-    ):
-        pid, bits, conf = m.group(1), m.group(2), float(m.group(3))
-        _bridge_cache[pid] = {"exotype_8bit": bits, "confidence": conf}
+    _loaded["bridge"] = bridge
+    return bridge
 
-    return _bridge_cache
+
+def init_worker(loaded, parse_cache):
+    """Pool initializer: reuse the parent's manifest, bridge and parse cache.
+
+    Forked workers already share them; under spawn this replaces one
+    re-read and re-parse of every file per worker with a single unpickle.
+    """
+    global _parse_cache
+    _loaded.update(loaded)
+    if _parse_cache is None:
+        _parse_cache = parse_cache
 
 
 def resolve_params(pattern_id, parsed):
@@ -245,6 +405,26 @@ MIX_MODE_MAP = {
     ":swap-halves":   {"component": ":crossover",       "doc": "swap upper/lower nibbles"},
 }
 
+# Diagram elements are plain tuples, built inline on the compile path:
+#   node    (id, component)
+#   wire    (from_id, from_port, to_id, to_port)
+#   literal (LITERAL, value, value_type, to_id, to_port)
+LITERAL = ":literal"
+
+# Output port of each IF-metric component
+METRIC_PORTS = {
+    ":diversity": "score",
+    ":entropy": "score",
+    ":evenness": "score",
+    ":dominance": "score",
+    ":autocorr": "score",
+    ":similarity": "score",
+    ":change-rate": "rate",
+}
+
+# Pattern sections quoted in a wiring's :interpretation, in order
+INTERPRETATION_FIELDS = (("if", "IF"), ("however", "HOWEVER"), ("then", "THEN"))
+
 # Map CT preservation to action style
 PRESERVATION_MAP = {
     ":full":    "identity",     # keep self
@@ -252,6 +432,15 @@ PRESERVATION_MAP = {
     ":none":    "replace",      # complete replacement
 }
 
+# HOWEVER-path source for the preservations that add no nodes; anything
+# else (":partial" and unknown values) blends self with previous
+HOWEVER_SOURCES = {
+    ":full": (":ctx-self", "sigil"),
+    "full":  (":ctx-self", "sigil"),
+    ":none": (":ctx-prev", "sigil"),
+    "none":  (":ctx-prev", "sigil"),
+}
+
 
 def compile_pattern(parsed, pattern_id):
     """Compile a parsed flexiarg into a wiring diagram.
@@ -274,36 +463,92 @@ def compile_pattern(parsed, pattern_id):
     mix_mode = params.get("mix-mode", ":none")
     invert_on_phe = params.get("invert-on-phenotype?", False)
 
+    # The diagram depends only on these scalars, so patterns sharing an
+    # encoding (most of the bridge) reuse one build
+    nodes, edges = build_diagram(match_threshold, update_prob, rotation, mix_mode,
+                                 invert_on_phe, ct.get("preservation", ":partial"))
+
+    # Build the diagram (node/edge tuples are shared with the build cache)
+    diagram = {
+        "nodes": nodes,
+        "edges": edges,
+        "output": ":output",
+    }
+
+    # Build metadata
+    title = parsed.get("title", pattern_id)
+    bits = parsed.get("bits", "00000000")
+    meta = {
+        "id": pattern_id,
+        "title": title,
+        "bits": bits,
+        "params-source": params_source,
+        "match-threshold": match_threshold,
+        "update-prob": update_prob,
+        "rotation": rotation,
+        "mix-mode": mix_mode,
+        "invert-on-phenotype?": invert_on_phe,
+    }
+
+    # Build interpretation from pattern text
+    interp_parts = ["%s: %s" % (label, parsed[key][:120])
+                    for key, label in INTERPRETATION_FIELDS if parsed.get(key)]
+    interpretation = " | ".join(interp_parts) if interp_parts else title
+
+    return {
+        "meta": meta,
+        "diagram": diagram,
+        "interpretation": interpretation,
+    }
+
+
+@lru_cache(maxsize=512, typed=True)
+def build_diagram(match_threshold, update_prob, rotation, mix_mode, invert_on_phe,
+                  preservation):
+    """Build the (nodes, edges) of a wiring diagram from its defining scalars.
+
+    Memoized; the returned node and edge tuples are immutable, so they are
+    shared between patterns.
+    """
+    params = {
+        "match-threshold": match_threshold,
+        "update-prob": update_prob,
+        "rotation": rotation,
+        "mix-mode": mix_mode,
+        "invert-on-phenotype?": invert_on_phe,
+    }
+    ct = {"preservation": preservation}
+
     nodes = []
     edges = []
 
     # --- CONTEXT extraction (always present) ---
     nodes.extend([
-        {"id": ":ctx-self", "component": ":context-self"},
-        {"id": ":ctx-pred", "component": ":context-pred"},
-        {"id": ":ctx-succ", "component": ":context-succ"},
-        {"id": ":ctx-prev", "component": ":context-prev"},
-        {"id": ":neighbors", "component": ":context-neighbors"},
+        (":ctx-self", ":context-self"),
+        (":ctx-pred", ":context-pred"),
+        (":ctx-succ", ":context-succ"),
+        (":ctx-prev", ":context-prev"),
+        (":neighbors", ":context-neighbors"),
     ])
 
     # --- IF-condition: what triggers this pattern? ---
     # Choose metric based on what the pattern cares about
-    if_metric, if_doc = choose_if_metric(parsed, params, ct)
-    nodes.append({"id": ":if-metric", "component": if_metric})
+    if_metric, if_doc = choose_if_metric(None, params, ct)  # reads params only
+    nodes.append((":if-metric", if_metric))
 
     # Wire metric input
     if if_metric in (":diversity", ":entropy", ":evenness", ":dominance",
                      ":autocorr"):
-        edges.append(edge(":neighbors", "sigils", ":if-metric", "sigils"))
+        edges.append((":neighbors", "sigils", ":if-metric", "sigils"))
     elif if_metric == ":similarity":
-        edges.append(edge(":ctx-self", "sigil", ":if-metric", "a"))
-        edges.append(edge(":ctx-prev", "sigil", ":if-metric", "b"))
+        edges.append((":ctx-self", "sigil", ":if-metric", "a"))
+        edges.append((":ctx-prev", "sigil", ":if-metric", "b"))
     elif if_metric == ":change-rate":
         # Need to construct two lists — use pred+self+succ for both gens
         # Simplified: use similarity between self and prev as proxy
-        nodes[-1] = {"id": ":if-metric", "component": ":similarity"}
-        edges.append(edge(":ctx-self", "sigil", ":if-metric", "a"))
-        edges.append(edge(":ctx-prev", "sigil", ":if-metric", "b"))
+        nodes[-1] = (":if-metric", ":similarity")
+        edges.append((":ctx-self", "sigil", ":if-metric", "a"))
+        edges.append((":ctx-prev", "sigil", ":if-metric", "b"))
 
     # --- THEN-action: what the pattern does when triggered ---
     then_node_id, then_port = build_then_path(
@@ -316,28 +561,28 @@ def compile_pattern(parsed, pattern_id):
     )
 
     # --- GATE: choose between THEN and HOWEVER based on IF-metric ---
-    nodes.append({"id": ":gate", "component": ":threshold-sigil"})
+    nodes.append((":gate", ":threshold-sigil"))
 
     # Wire the gate
-    edges.append(edge_from_metric(":if-metric", if_metric, ":gate", "score"))
-    edges.append(literal(match_threshold, "scalar", ":gate", "threshold"))
-    edges.append(edge(then_node_id, then_port, ":gate", "above"))
-    edges.append(edge(however_node_id, however_port, ":gate", "below"))
+    edges.append((":if-metric", METRIC_PORTS.get(if_metric, "score"), ":gate", "score"))
+    edges.append((LITERAL, match_threshold, "scalar", ":gate", "threshold"))
+    edges.append((then_node_id, then_port, ":gate", "above"))
+    edges.append((however_node_id, however_port, ":gate", "below"))
 
     # --- PHENOTYPE INVERSION (optional) ---
     if invert_on_phe:
         # When phenotype says invert, swap the gate's sense
-        nodes.append({"id": ":phe", "component": ":context-phe"})
-        nodes.append({"id": ":phe-bit", "component": ":bit-test"})
-        nodes.append({"id": ":phe-gate", "component": ":if-then-else-sigil"})
+        nodes.append((":phe", ":context-phe"))
+        nodes.append((":phe-bit", ":bit-test"))
+        nodes.append((":phe-gate", ":if-then-else-sigil"))
 
-        edges.append(edge(":phe", "bits", ":phe-bit", "sigil"))
-        edges.append(literal(0, "int", ":phe-bit", "index"))
+        edges.append((":phe", "bits", ":phe-bit", "sigil"))
+        edges.append((LITERAL, 0, "int", ":phe-bit", "index"))
 
         # If phenotype bit 0 is set, invert: use HOWEVER when metric is high
-        edges.append(edge(":phe-bit", "bit", ":phe-gate", "cond"))
-        edges.append(edge(however_node_id, however_port, ":phe-gate", "then"))
-        edges.append(edge(":gate", "result", ":phe-gate", "else"))
+        edges.append((":phe-bit", "bit", ":phe-gate", "cond"))
+        edges.append((however_node_id, however_port, ":phe-gate", "then"))
+        edges.append((":gate", "result", ":phe-gate", "else"))
 
         output_node = ":phe-gate"
     else:
@@ -345,57 +590,22 @@ def compile_pattern(parsed, pattern_id):
 
     # --- POST: probabilistic application ---
     if update_prob < 1.0:
-        nodes.append({"id": ":prob-gate", "component": ":threshold-sigil"})
+        nodes.append((":prob-gate", ":threshold-sigil"))
         # Use a "random" score — approximate with balance of self
-        nodes.append({"id": ":self-balance", "component": ":balance"})
-        edges.append(edge(":ctx-self", "sigil", ":self-balance", "sigil"))
-        edges.append(edge(":self-balance", "bal", ":prob-gate", "score"))
-        edges.append(literal(1.0 - update_prob, "scalar", ":prob-gate", "threshold"))
-        edges.append(edge(output_node, "result", ":prob-gate", "above"))
-        edges.append(edge(":ctx-self", "sigil", ":prob-gate", "below"))
+        nodes.append((":self-balance", ":balance"))
+        edges.append((":ctx-self", "sigil", ":self-balance", "sigil"))
+        edges.append((":self-balance", "bal", ":prob-gate", "score"))
+        edges.append((LITERAL, 1.0 - update_prob, "scalar", ":prob-gate", "threshold"))
+        edges.append((output_node, "result", ":prob-gate", "above"))
+        edges.append((":ctx-self", "sigil", ":prob-gate", "below"))
         output_node = ":prob-gate"
 
     # --- OUTPUT terminal: route through :output-sigil for wiring runtime ---
-    nodes.append({"id": ":output", "component": ":output-sigil"})
-    edges.append(edge(output_node, "result", ":output", "sigil"))
+    nodes.append((":output", ":output-sigil"))
+    edges.append((output_node, "result", ":output", "sigil"))
 
-    # Build the diagram
-    diagram = {
-        "nodes": nodes,
-        "edges": edges,
-        "output": ":output",
-    }
 
-    # Build metadata
-    title = parsed.get("title", pattern_id)
-    bits = parsed.get("bits", "00000000")
-    meta = {
-        "id": pattern_id,
-        "title": title,
-        "bits": bits,
-        "params-source": params_source,
-        "match-threshold": match_threshold,
-        "update-prob": update_prob,
-        "rotation": rotation,
-        "mix-mode": mix_mode,
-        "invert-on-phenotype?": invert_on_phe,
-    }
-
-    # Build interpretation from pattern text
-    interp_parts = []
-    if parsed.get("if"):
-        interp_parts.append(f"IF: {parsed['if'][:120]}")
-    if parsed.get("however"):
-        interp_parts.append(f"HOWEVER: {parsed['however'][:120]}")
-    if parsed.get("then"):
-        interp_parts.append(f"THEN: {parsed['then'][:120]}")
-    interpretation = " | ".join(interp_parts) if interp_parts else title
-
-    return {
-        "meta": meta,
-        "diagram": diagram,
-        "interpretation": interpretation,
-    }
+    return tuple(nodes), tuple(edges)
 
 
 def choose_if_metric(parsed, params, ct):
@@ -438,45 +648,45 @@ def build_then_path(nodes, edges, mix_mode, update_prob, rotation, params):
         return ":ctx-self", "sigil"
 
     if component == ":majority":
-        nodes.append({"id": ":then-mix", "component": ":majority"})
-        edges.append(edge(":neighbors", "sigils", ":then-mix", "sigils"))
+        nodes.append((":then-mix", ":majority"))
+        edges.append((":neighbors", "sigils", ":then-mix", "sigils"))
         result_id, result_port = ":then-mix", "result"
 
     elif component == ":bit-xor":
-        nodes.append({"id": ":then-mix", "component": ":bit-xor"})
-        edges.append(edge(":ctx-pred", "sigil", ":then-mix", "a"))
-        edges.append(edge(":ctx-succ", "sigil", ":then-mix", "b"))
+        nodes.append((":then-mix", ":bit-xor"))
+        edges.append((":ctx-pred", "sigil", ":then-mix", "a"))
+        edges.append((":ctx-succ", "sigil", ":then-mix", "b"))
         result_id, result_port = ":then-mix", "result"
 
     elif component == ":bit-shift-left":
-        nodes.append({"id": ":then-mix", "component": ":bit-shift-left"})
-        edges.append(edge(":ctx-self", "sigil", ":then-mix", "sigil"))
-        edges.append(literal(max(1, rotation), "int", ":then-mix", "n"))
+        nodes.append((":then-mix", ":bit-shift-left"))
+        edges.append((":ctx-self", "sigil", ":then-mix", "sigil"))
+        edges.append((LITERAL, max(1, rotation), "int", ":then-mix", "n"))
         result_id, result_port = ":then-mix", "result"
 
     elif component == ":bit-shift-right":
-        nodes.append({"id": ":then-mix", "component": ":bit-shift-right"})
-        edges.append(edge(":ctx-self", "sigil", ":then-mix", "sigil"))
-        edges.append(literal(max(1, rotation), "int", ":then-mix", "n"))
+        nodes.append((":then-mix", ":bit-shift-right"))
+        edges.append((":ctx-self", "sigil", ":then-mix", "sigil"))
+        edges.append((LITERAL, max(1, rotation), "int", ":then-mix", "n"))
         result_id, result_port = ":then-mix", "result"
 
     elif component == ":bit-not":
-        nodes.append({"id": ":then-mix", "component": ":bit-not"})
-        edges.append(edge(":ctx-self", "sigil", ":then-mix", "sigil"))
+        nodes.append((":then-mix", ":bit-not"))
+        edges.append((":ctx-self", "sigil", ":then-mix", "sigil"))
         result_id, result_port = ":then-mix", "result"
 
     elif component == ":mutate":
-        nodes.append({"id": ":then-mix", "component": ":mutate"})
-        edges.append(edge(":ctx-self", "sigil", ":then-mix", "sigil"))
-        edges.append(literal(update_prob, "scalar", ":then-mix", "rate"))
+        nodes.append((":then-mix", ":mutate"))
+        edges.append((":ctx-self", "sigil", ":then-mix", "sigil"))
+        edges.append((LITERAL, update_prob, "scalar", ":then-mix", "rate"))
         result_id, result_port = ":then-mix", "result"
 
     elif component == ":crossover":
         # swap-halves: crossover self with pred at midpoint (bit 4)
-        nodes.append({"id": ":then-mix", "component": ":crossover"})
-        edges.append(edge(":ctx-self", "sigil", ":then-mix", "a"))
-        edges.append(edge(":ctx-pred", "sigil", ":then-mix", "b"))
-        edges.append(literal(4, "int", ":then-mix", "point"))
+        nodes.append((":then-mix", ":crossover"))
+        edges.append((":ctx-self", "sigil", ":then-mix", "a"))
+        edges.append((":ctx-pred", "sigil", ":then-mix", "b"))
+        edges.append((LITERAL, 4, "int", ":then-mix", "point"))
         result_id, result_port = ":then-mix", "result"
 
     else:
@@ -484,9 +694,9 @@ def build_then_path(nodes, edges, mix_mode, update_prob, rotation, params):
 
     # Optional post-rotation
     if rotation > 0 and component not in (":bit-shift-left", ":bit-shift-right"):
-        nodes.append({"id": ":then-rotate", "component": ":bit-shift-left"})
-        edges.append(edge(result_id, result_port, ":then-rotate", "sigil"))
-        edges.append(literal(rotation, "int", ":then-rotate", "n"))
+        nodes.append((":then-rotate", ":bit-shift-left"))
+        edges.append((result_id, result_port, ":then-rotate", "sigil"))
+        edges.append((LITERAL, rotation, "int", ":then-rotate", "n"))
         return ":then-rotate", "result"
 
     return result_id, result_port
@@ -500,150 +710,173 @@ def build_however_path(nodes, edges, ct):
       :partial → average self with previous
       :none → use previous (defer)
     """
-    preservation = ct.get("preservation", ":partial")
+    source = HOWEVER_SOURCES.get(ct.get("preservation", ":partial"))
+    if source is not None:
+        return source
 
-    if preservation == ":full" or preservation == "full":
-        return ":ctx-self", "sigil"
-    elif preservation == ":none" or preservation == "none":
-        return ":ctx-prev", "sigil"
-    else:
-        # :partial → blend self with previous
-        nodes.append({"id": ":however-blend", "component": ":sigil-avg"})
-        edges.append(edge(":ctx-self", "sigil", ":however-blend", "a"))
-        edges.append(edge(":ctx-prev", "sigil", ":however-blend", "b"))
-        return ":however-blend", "result"
+    # :partial → blend self with previous
+    nodes.append((":however-blend", ":sigil-avg"))
+    edges.append((":ctx-self", "sigil", ":however-blend", "a"))
+    edges.append((":ctx-prev", "sigil", ":however-blend", "b"))
+    return ":however-blend", "result"
 
 
 # ---------------------------------------------------------------------------
-# Edge helpers
+# EDN output
 # ---------------------------------------------------------------------------
 
-def edge(from_id, from_port, to_id, to_port):
-    return {"from": from_id, "from-port": from_port, "to": to_id, "to-port": to_port}
-
+WIRING_HEAD_TMPL = (
+    '{:meta {:id "%s"\n'
+    '        :title "%s"\n'
+    '        :bits "%s"\n'
+    '        :params-source :%s\n'
+    '        :match-threshold %s\n'
+    '        :update-prob %s\n'
+    '        :rotation %s\n'
+    '        :mix-mode %s\n'
+    '        :invert-on-phenotype? %s}\n'
+    '\n'
+    ' :diagram\n'
+    ' {:nodes\n'
+    '  [\n'
+)
+WIRING_NODE_TMPL = '   {:id %s :component %s}\n'
+WIRING_EDGE_TMPL = '   {:from %s :from-port :%s :to %s :to-port :%s}\n'
+WIRING_LITERAL_TMPL = '   {:value %s :value-type :%s :to %s :to-port :%s}\n'
+WIRING_EDGES_OPEN = '  ]\n\n  :edges\n  [\n'
+WIRING_TAIL_TMPL = '  ]\n\n  :output %s}\n\n :interpretation\n "%s"}'
 
-def literal(value, value_type, to_id, to_port):
-    return {"value": value, "value-type": value_type, "to": to_id, "to-port": to_port}
-
-
-def edge_from_metric(metric_id, metric_component, to_id, to_port):
-    """Get the right output port name for a metric component."""
-    port_map = {
-        ":diversity": "score",
-        ":entropy": "score",
-        ":evenness": "score",
-        ":dominance": "score",
-        ":autocorr": "score",
-        ":similarity": "score",
-        ":change-rate": "rate",
-    }
-    port = port_map.get(metric_component, "score")
-    return edge(metric_id, port, to_id, to_port)
-
-
-# ---------------------------------------------------------------------------
-# EDN output
-# ---------------------------------------------------------------------------
 
 def to_edn(obj, indent=0):
     """Convert a Python object to EDN string."""
-    pad = " " * indent
+    buf = []
+    emit_edn(obj, buf, indent)
+    return "".join(buf)
+
 
+def emit_edn(obj, out, indent=0):
+    """Append the EDN fragments for obj to the list out."""
     if isinstance(obj, dict):
-        items = []
-        for k, v in obj.items():
-            edn_key = f":{k}" if not str(k).startswith(":") else str(k)
-            items.append(f"{pad} {edn_key} {to_edn(v, indent + 1)}")
-        return "{\n" + "\n".join(items) + "}"
+        pad = " " * indent
+        out.append("{\n")
+        for i, (k, v) in enumerate(obj.items()):
+            edn_key = str(k) if str(k).startswith(":") else ":" + str(k)
+            out.append(("%s %s " if i == 0 else "\n%s %s ") % (pad, edn_key))
+            emit_edn(v, out, indent + 1)
+        out.append("}")
 
     elif isinstance(obj, list):
         if not obj:
-            return "[]"
+            out.append("[]")
+            return
         # Check if items are simple
         if all(isinstance(x, (int, float, str, bool)) for x in obj):
-            return "[" + " ".join(to_edn(x) for x in obj) + "]"
-        items = [f"{pad} {to_edn(x, indent + 1)}" for x in obj]
-        return "[\n" + "\n".join(items) + "]"
+            sep = "["
+            for x in obj:
+                out.append(sep)
+                emit_edn(x, out)
+                sep = " "
+            out.append("]")
+            return
+        pad = " " * indent
+        out.append("[\n")
+        for i, x in enumerate(obj):
+            out.append(pad + " " if i == 0 else "\n" + pad + " ")
+            emit_edn(x, out, indent + 1)
+        out.append("]")
 
     elif isinstance(obj, bool):
-        return "true" if obj else "false"
-
-    elif isinstance(obj, int):
-        return str(obj)
-
-    elif isinstance(obj, float):
-        return str(obj)
+        out.append("true" if obj else "false")
 
     elif isinstance(obj, str):
-        if obj.startswith(":"):
-            return obj
-        return f'"{obj}"'
+        out.append(obj if obj.startswith(":") else '"' + obj + '"')
 
     else:
-        return str(obj)
+        out.append(str(obj))
+
+
+def edn_str(s):
+    """Escape backslashes and double quotes for an EDN string literal."""
+    return s.replace('\\', '\\\\').replace('"', '\\"')
+
+
+def diagram_body_edn(nodes, edges):
+    """EDN text for a diagram's node and edge vectors, rendered once per diagram."""
+    # Equal tuples can still print differently (1 == 1.0 == True), so the
+    # literal value types are part of the key
+    literal_types = tuple(type(e[1]) for e in edges if len(e) != 4)
+    return _render_diagram_body(tuple(nodes), tuple(edges), literal_types)
+
+
+@lru_cache(maxsize=512)
+def _render_diagram_body(nodes, edges, literal_types):
+    buf = [WIRING_NODE_TMPL % node for node in nodes]
+    buf.append(WIRING_EDGES_OPEN)
+    for e in edges:
+        if len(e) == 4:
+            buf.append(WIRING_EDGE_TMPL % e)
+        else:
+            _, value, vtype, to_id, to_port = e
+            val_str = str(int(value)) if vtype == "int" else str(value)
+            buf.append(WIRING_LITERAL_TMPL % (val_str, vtype, to_id, to_port))
+    return "".join(buf)
 
 
 def format_wiring_edn(wiring):
     """Format a wiring diagram as clean, readable EDN."""
     meta = wiring["meta"]
     diagram = wiring["diagram"]
-    interp = wiring["interpretation"]
-
-    def edn_str(s):
-        return s.replace('\\', '\\\\').replace('"', '\\"')
-
-    lines = []
-    lines.append(f'{{:meta {{:id "{edn_str(meta["id"])}"')
-    lines.append(f'        :title "{edn_str(meta["title"])}"')
-    lines.append(f'        :bits "{meta["bits"]}"')
-    lines.append(f'        :params-source :{meta["params-source"]}')
-    lines.append(f'        :match-threshold {meta["match-threshold"]}')
-    lines.append(f'        :update-prob {meta["update-prob"]}')
-    lines.append(f'        :rotation {meta["rotation"]}')
-    lines.append(f'        :mix-mode {meta["mix-mode"]}')
-    lines.append(f'        :invert-on-phenotype? {str(meta["invert-on-phenotype?"]).lower()}}}')
-    lines.append("")
-
-    # Diagram
-    lines.append(" :diagram")
-    lines.append(" {:nodes")
-    lines.append("  [")
-    for node in diagram["nodes"]:
-        nid = node["id"]
-        comp = node["component"]
-        lines.append(f'   {{:id {nid} :component {comp}}}')
-    lines.append("  ]")
-    lines.append("")
-
-    lines.append("  :edges")
-    lines.append("  [")
+
+    head = WIRING_HEAD_TMPL % (
+        edn_str(meta["id"]),
+        edn_str(meta["title"]),
+        meta["bits"],
+        meta["params-source"],
+        meta["match-threshold"],
+        meta["update-prob"],
+        meta["rotation"],
+        meta["mix-mode"],
+        str(meta["invert-on-phenotype?"]).lower(),
+    )
+    body = diagram_body_edn(diagram["nodes"], diagram["edges"])
+    # Interpretation (escaped for valid EDN)
+    tail = WIRING_TAIL_TMPL % (diagram["output"], edn_str(wiring["interpretation"]))
+    return head + body + tail
+
+
+# ---------------------------------------------------------------------------
+# JSON output
+# ---------------------------------------------------------------------------
+
+def wiring_to_json(wiring):
+    """The wiring as plain JSON-ready dicts, shaped like the EDN output."""
+    diagram = wiring["diagram"]
+    edges = []
     for e in diagram["edges"]:
-        if "from" in e:
-            parts = [f':from {e["from"]}', f':from-port :{e["from-port"]}',
-                     f':to {e["to"]}', f':to-port :{e["to-port"]}']
-            lines.append(f'   {{{" ".join(parts)}}}')
+        if len(e) == 4:
+            edges.append({"from": e[0], "from-port": e[1], "to": e[2], "to-port": e[3]})
         else:
-            val = e["value"]
-            vtype = e["value-type"]
-            if vtype == "int":
-                val_str = str(int(val))
-            else:
-                val_str = str(val)
-            parts = [f':value {val_str}', f':value-type :{vtype}',
-                     f':to {e["to"]}', f':to-port :{e["to-port"]}']
-            lines.append(f'   {{{" ".join(parts)}}}')
-    lines.append("  ]")
-    lines.append("")
-
-    lines.append(f'  :output {diagram["output"]}}}')
-    lines.append("")
+            _, value, vtype, to_id, to_port = e
+            edges.append({"value": int(value) if vtype == "int" else value,
+                          "value-type": vtype, "to": to_id, "to-port": to_port})
+    return {
+        "meta": wiring["meta"],
+        "diagram": {
+            "nodes": [{"id": node_id, "component": comp}
+                      for node_id, comp in diagram["nodes"]],
+            "edges": edges,
+            "output": diagram["output"],
+        },
+        "interpretation": wiring["interpretation"],
+    }
 
-    # Interpretation (escape double quotes and backslashes for valid EDN)
-    lines.append(f' :interpretation')
-    safe_interp = interp.replace('\\', '\\\\').replace('"', '\\"')
-    lines.append(f' "{safe_interp}"}}')
 
-    return "\n".join(lines)
+def format_wiring_json(wiring):
+    """Encode a wiring diagram as indented UTF-8 JSON bytes."""
+    obj = wiring_to_json(wiring)
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2)
+    return json.dumps(obj, indent=2, ensure_ascii=False).encode("utf-8")
 
 
 # ---------------------------------------------------------------------------
@@ -652,7 +885,7 @@ def format_wiring_edn(wiring):
 
 def compile_one(pattern_id):
     """Compile a single pattern to a wiring diagram."""
-    fpath = LIBRARY_DIR / f"{pattern_id}.flexiarg"
+    fpath = LIBRARY_DIR / (pattern_id + ".flexiarg")
 
     if fpath.exists():
         parsed = parse_flexiarg(fpath)
@@ -668,6 +901,57 @@ def compile_one(pattern_id):
     return wiring
 
 
+def write_edn_file(out_path, data):
+    """Write already-encoded EDN (or JSON) bytes to out_path."""
+    out_path.write_bytes(data)
+
+
+def drain_writes(queue, errors):
+    """Writer thread: write (path, data) pairs from queue until a None arrives.
+
+    Keeps draining after a failure so producers never stall; the first
+    error is left in errors for the caller to raise.
+    """
+    while True:
+        item = queue.get()
+        if item is None:
+            return
+        try:
+            write_edn_file(*item)
+        except OSError as e:
+            errors.append(e)
+
+
+def compile_and_write(pattern_id, out_dir, keep_text=False, write=write_edn_file,
+                      fmt="edn"):
+    """Compile one pattern and write it into out_dir as EDN or, with fmt="json", JSON.
+
+    Returns (edn_text, out_name, params_source, mix_mode, new_parses), or
+    None if the pattern is unknown. edn_text (the file's text in either
+    format) is None unless keep_text is
+    set; new_parses carries parse-cache entries made here so a pool
+    worker can return them to the parent process. write(out_path, data)
+    does the file write, e.g. by handing it to a writer thread.
+    """
+    global _parse_cache_new
+    wiring = compile_one(pattern_id)
+    new_parses, _parse_cache_new = _parse_cache_new, {}
+    if wiring is None:
+        return None
+
+    if fmt == "json":
+        data = format_wiring_json(wiring)
+    else:
+        data = format_wiring_edn(wiring).encode("utf-8")
+    safe_name = pattern_id.replace("/", "-")
+    out_path = out_dir / ("compiled-" + safe_name + "." + fmt)
+    write(out_path, data)
+
+    meta = wiring["meta"]
+    return (data.decode("utf-8") if keep_text else None, out_path.name,
+            meta["params-source"], meta["mix-mode"], new_parses)
+
+
 def collect_all_bridge_ids():
     """Get all pattern IDs from the bridge."""
     bridge = load_bridge()
@@ -676,7 +960,9 @@ def collect_all_bridge_ids():
 
 def main():
     parser = argparse.ArgumentParser(description="Pattern → Wiring Diagram Compiler")
-    parser.add_argument("pattern_id", nargs="?", help="Pattern ID (e.g. iching/hexagram-11-tai)")
+    parser.add_argument("pattern_ids", nargs="*", metavar="pattern_id",
+                        help="Pattern ID(s) (e.g. iching/hexagram-11-tai); "
+                             "several can be compiled in one run")
     parser.add_argument("--all-hexagrams", action="store_true",
                         help="Compile all 64 hexagram patterns")
     parser.add_argument("--all", action="store_true",
@@ -684,6 +970,8 @@ def main():
     parser.add_argument("--stats", action="store_true",
                         help="Print compilation statistics")
     parser.add_argument("--out", help="Output directory (default: xenotype-wirings/)")
+    parser.add_argument("--format", choices=("edn", "json"), default="edn",
+                        help="Output format (default: edn)")
     args = parser.parse_args()
 
     out_dir = Path(args.out) if args.out else WIRINGS_DIR
@@ -696,8 +984,10 @@ def main():
         for fpath in sorted(LIBRARY_DIR.glob("iching/hexagram-*.flexiarg")):
             pid = f"iching/{fpath.stem}"
             pattern_ids.append(pid)
-    elif args.pattern_id:
-        pattern_ids = [args.pattern_id]
+    elif args.pattern_ids:
+        # Batch callers pass every ID at once so interpreter startup and the
+        # bridge/manifest parses are paid once rather than per pattern.
+        pattern_ids = list(dict.fromkeys(args.pattern_ids))
     else:
         parser.print_help()
         return
@@ -706,38 +996,63 @@ def main():
     sources = {"flexiarg": 0, "manifest": 0, "bridge": 0, "default": 0}
     mix_modes = {}
 
-    for pid in pattern_ids:
-        wiring = compile_one(pid)
-        if wiring is None:
-            continue
-
-        edn_text = format_wiring_edn(wiring)
+    # Patterns compile independently; fan large batches out across processes
+    # and tally stats here from what each one returns
+    compile_to_out = partial(compile_and_write, out_dir=out_dir,
+                             keep_text=len(pattern_ids) == 1, fmt=args.format)
+    if len(pattern_ids) > 1 and (os.cpu_count() or 1) > 1:
+        # Parse the shared inputs once here rather than once per worker
+        if MANIFEST_PATH.exists():
+            load_manifest_params()
+        if BRIDGE_PATH.exists():
+            load_bridge()
+        with ProcessPoolExecutor(initializer=init_worker,
+                                 initargs=(dict(_loaded), load_parse_cache())) as executor:
+            results = list(executor.map(compile_to_out, pattern_ids, chunksize=16))
+    elif len(pattern_ids) > 1:
+        # Serial batch: a writer thread overlaps file I/O with compiling
+        queue, errors = SimpleQueue(), []
+        writer = threading.Thread(target=drain_writes, args=(queue, errors))
+        writer.start()
+
+        def enqueue(out_path, data):
+            queue.put((out_path, data))
+
+        try:
+            results = [compile_to_out(pid, write=enqueue) for pid in pattern_ids]
+        finally:
+            queue.put(None)
+            writer.join()
+        if errors:
+            raise errors[0]
+    else:
+        results = [compile_to_out(pid) for pid in pattern_ids]
 
-        safe_name = pid.replace("/", "-")
-        out_path = out_dir / f"compiled-{safe_name}.edn"
-        out_path.write_text(edn_text, encoding="utf-8")
+    for pid, result in zip(pattern_ids, results):
+        if result is None:
+            continue
+        edn_text, out_name, src, mm, new_parses = result
+        merge_parse_cache(new_parses)
         compiled += 1
 
         # Track stats
-        src = wiring["meta"]["params-source"]
         sources[src] = sources.get(src, 0) + 1
-        mm = wiring["meta"]["mix-mode"]
         mix_modes[mm] = mix_modes.get(mm, 0) + 1
 
         if len(pattern_ids) == 1:
             print(edn_text)
         elif not args.stats:
-            print(f"  {pid} → {out_path.name}")
+            print(f"  {pid} → {out_name}")
 
     if len(pattern_ids) > 1:
         print(f"\nCompiled {compiled}/{len(pattern_ids)} patterns → {out_dir}/")
 
     if args.stats or len(pattern_ids) > 10:
         print(f"\nParams sources:")
-        for src, count in sorted(sources.items(), key=lambda x: -x[1]):
+        for src, count in sorted(sources.items(), key=itemgetter(1), reverse=True):
             print(f"  {src:10s}: {count}")
         print(f"\nMix modes:")
-        for mm, count in sorted(mix_modes.items(), key=lambda x: -x[1]):
+        for mm, count in sorted(mix_modes.items(), key=itemgetter(1), reverse=True):
             print(f"  {mm:18s}: {count}")
 
 
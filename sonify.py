@@ -5,13 +5,23 @@ See sonify.md for setup, CLI usage, and extension points.
 """
 
 import argparse
-import json
 import math
 import random
-from collections import defaultdict
-from typing import Any, Dict, Iterable, List, Optional, Tuple
+from array import array
+from itertools import chain
+from operator import itemgetter
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
 
 import mido
+import numpy as np
+
+try:
+    from orjson import loads as json_loads  # optional, faster parsing
+except ImportError:
+    from json import loads as json_loads
+
+# Events as parallel (SoA) arrays: t, agent, sigil, parsed exotype
+EventColumns = Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]
 
 BITS = 36
 MAX_SIGIL = 255
@@ -34,7 +44,7 @@ def _get_first(d: Dict[str, Any], keys: Iterable[str]) -> Optional[Any]:
     return None
 
 
-def normalize_event(raw: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+def _event_fields(raw: Dict[str, Any]) -> Optional[Tuple[int, int, int, int]]:
     if not isinstance(raw, dict):
         return None
     t = _get_first(raw, ALIASES["t"])
@@ -49,43 +59,66 @@ def normalize_event(raw: Dict[str, Any]) -> Optional[Dict[str, Any]]:
         sigil = int(sigil)
     except (TypeError, ValueError):
         return None
+    # Parsed here, once per event, so sonify's hot path only sees ints
+    return t, agent, sigil, parse_exotype(exotype)
+
+
+def normalize_event(raw: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    fields = _event_fields(raw)
+    if fields is None:
+        return None
+    t, agent, sigil, exotype = fields
     return {"t": t, "agent": agent, "sigil": sigil, "exotype": exotype}
 
 
+EXOTYPE_MASK = (1 << BITS) - 1
+# bytes of 0/1 values -> ASCII "0"/"1", so a bit list parses with one int(..., 2)
+BIT_DIGITS = bytes.maketrans(b"\x00\x01", b"01")
+
+
 def parse_exotype(value: Any) -> int:
     """Parse exotype representations into a 36-bit integer."""
+    if type(value) is int:  # the common case, e.g. synthetic runs
+        return value & EXOTYPE_MASK
     if value is None:
         return 0
     if isinstance(value, bool):
-        return int(value) & ((1 << BITS) - 1)
+        return int(value) & EXOTYPE_MASK
     if isinstance(value, int):
-        return value & ((1 << BITS) - 1)
+        return value & EXOTYPE_MASK
     if isinstance(value, str):
         s = value.strip().replace("_", "").replace(" ", "")
         if s.startswith("0b") or s.startswith("0x") or s.isdigit():
             try:
-                return int(s, 0) & ((1 << BITS) - 1)
+                return int(s, 0) & EXOTYPE_MASK
             except ValueError:
                 pass
         if s and all(ch in "01" for ch in s):
-            return int(s, 2) & ((1 << BITS) - 1)
+            return int(s, 2) & EXOTYPE_MASK
         return 0
     if isinstance(value, (list, tuple)):
         if len(value) == 0:
             return 0
         if len(value) >= BITS and all(isinstance(v, (int, bool)) for v in value[:BITS]):
-            bits = 0
-            for idx, bit in enumerate(value[:BITS]):
-                if int(bit):
-                    bits |= 1 << (BITS - 1 - idx)
-            return bits & ((1 << BITS) - 1)
+            # First BITS entries, most significant first; any nonzero entry is a 1
+            return int(bytes(map(bool, value[:BITS])).translate(BIT_DIGITS), 2)
         if len(value) == 1 and isinstance(value[0], int):
-            return value[0] & ((1 << BITS) - 1)
+            return value[0] & EXOTYPE_MASK
     return 0
 
 
-def popcount(value: int) -> int:
-    return value.bit_count()
+# Set bits in each byte value, for popcounts on NumPy < 2.0
+BYTE_POPCOUNT = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint8)
+
+
+def popcounts(exotypes: np.ndarray) -> np.ndarray:
+    """Popcount of each 36-bit exotype in a uint64 array."""
+    exotypes = np.ascontiguousarray(exotypes, dtype=np.uint64)
+    if hasattr(np, "bitwise_count"):  # NumPy >= 2.0: hardware popcount
+        return np.bitwise_count(exotypes).astype(np.int64)
+    # Little-endian bytes, so the low BITS bits are the first 5 bytes
+    as_bytes = exotypes.astype("<u8", copy=False).view(np.uint8).reshape(-1, 8)
+    return BYTE_POPCOUNT[as_bytes[:, :(BITS + 7) // 8]].sum(axis=1, dtype=np.int64)
 
 
 def sigil_to_pitch(sigil: int) -> int:
@@ -94,53 +127,86 @@ def sigil_to_pitch(sigil: int) -> int:
     Swap or wrap this function to implement scale quantization or
     alternate pitch mappings.
     """
-    sigil = max(0, min(MAX_SIGIL, sigil))
+    sigil = 0 if sigil < 0 else (MAX_SIGIL if sigil > MAX_SIGIL else sigil)
     span = MAX_PITCH - MIN_PITCH
-    return int(MIN_PITCH + round(sigil * span / MAX_SIGIL))
+    # Integer round-half-up; sigil * span / MAX_SIGIL never lands on .5
+    return MIN_PITCH + (sigil * span + MAX_SIGIL // 2) // MAX_SIGIL
 
 
-def load_events(path: str) -> List[Dict[str, Any]]:
+def sigil_pitch_table() -> np.ndarray:
+    """Pitch for every sigil 0-255 under the current `sigil_to_pitch`."""
+    return np.array([sigil_to_pitch(sigil) for sigil in range(MAX_SIGIL + 1)], dtype=np.int64)
+
+
+def _document_events(parsed: Any) -> List[Any]:
+    """Raw events in a JSON document: a list, an "events" list, the first list value, or the object itself."""
+    if isinstance(parsed, list):
+        return parsed
+    if isinstance(parsed, dict):
+        if isinstance(parsed.get("events"), list):
+            return parsed["events"]
+        for value in parsed.values():
+            if isinstance(value, list):
+                return value
+        return [parsed]
+    return []
+
+
+def _nonblank_lines(fh: Iterable[str]) -> Iterator[str]:
+    for line in fh:
+        line = line.strip()
+        if line:
+            yield line
+
+
+def _raw_events(path: str) -> Iterator[Any]:
+    """Raw events from a JSON document or a JSONL file.
+
+    JSONL is parsed line by line as the file is read. A file whose first
+    line is a complete JSON value is JSONL if more lines follow, and a
+    one-line document otherwise.
+    """
     with open(path, "r", encoding="utf-8") as fh:
-        content = fh.read().strip()
-    events: List[Dict[str, Any]] = []
-    if not content:
-        return events
-    parsed = None
-    if content[0] in "[{":
-        try:
-            parsed = json.loads(content)
-        except json.JSONDecodeError:
-            parsed = None
-    if parsed is not None:
-        if isinstance(parsed, list):
-            raw_events = parsed
-        elif isinstance(parsed, dict):
-            if isinstance(parsed.get("events"), list):
-                raw_events = parsed["events"]
-            else:
-                raw_events = None
-                for value in parsed.values():
-                    if isinstance(value, list):
-                        raw_events = value
-                        break
-                if raw_events is None:
-                    raw_events = [parsed]
+        lines = _nonblank_lines(fh)
+        first = next(lines, None)
+        if first is None:
+            return
+        if first[0] in "[{":
+            try:
+                parsed = json_loads(first)
+            except ValueError:
+                # Incomplete on its own line: one JSON document spread over the file
+                yield from _document_events(json_loads(first + "\n" + fh.read()))
+                return
+            second = next(lines, None)
+            if second is None:
+                yield from _document_events(parsed)
+                return
+            yield parsed
+            lines = chain([second], lines)
         else:
-            raw_events = []
-        for raw in raw_events:
-            event = normalize_event(raw)
-            if event:
-                events.append(event)
-        return events
-    for line in content.splitlines():
-        line = line.strip()
-        if not line:
-            continue
-        raw = json.loads(line)
-        event = normalize_event(raw)
-        if event:
-            events.append(event)
-    return events
+            lines = chain([first], lines)
+        yield from map(json_loads, lines)
+
+
+def load_events(path: str) -> List[Dict[str, Any]]:
+    """Load normalized events from a JSON document or a JSONL file."""
+    return [event for event in map(normalize_event, _raw_events(path)) if event]
+
+
+def load_event_columns(path: str) -> EventColumns:
+    """Load events straight into columns, without a dict per event."""
+    ts, agents, sigils, exotypes = array("q"), array("q"), array("q"), array("Q")
+    for raw in _raw_events(path):
+        fields = _event_fields(raw)
+        if fields is not None:
+            t, agent, sigil, exotype = fields
+            ts.append(t)
+            agents.append(agent)
+            sigils.append(sigil)
+            exotypes.append(exotype)
+    return (np.frombuffer(ts, dtype=np.int64), np.frombuffer(agents, dtype=np.int64),
+            np.frombuffer(sigils, dtype=np.int64), np.frombuffer(exotypes, dtype=np.uint64))
 
 
 def generate_synthetic() -> List[Dict[str, Any]]:
@@ -162,32 +228,93 @@ def generate_synthetic() -> List[Dict[str, Any]]:
     return events
 
 
-def compute_stats(popcounts: List[int]) -> Tuple[float, float]:
-    """Return normalized (mean, variance) of popcounts."""
-    if not popcounts:
-        return 0.0, 0.0
-    mean = sum(popcounts) / len(popcounts)
-    var = sum((x - mean) ** 2 for x in popcounts) / len(popcounts)
+def compute_stats(counts: np.ndarray, totals: np.ndarray,
+                  totals_sq: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Return normalized (mean, variance) of popcounts for every timestep at once.
+
+    Takes each timestep's popcount count, sum and sum of squares; empty
+    timesteps get (0.0, 0.0).
+    """
+    n = np.maximum(counts, 1)
+    mean = totals / n
+    var = (counts * totals_sq - totals * totals) / (n * n)
     mean_norm = mean / BITS
-    var_norm = max(0.0, min(1.0, var / VAR_NORM_MAX))
+    var_norm = np.clip(var / VAR_NORM_MAX, 0.0, 1.0)
     return mean_norm, var_norm
 
 
+def event_columns(events: List[Dict[str, Any]]) -> EventColumns:
+    """Event dicts as columns, one column at a time."""
+    n = len(events)
+    return (np.fromiter(map(itemgetter("t"), events), dtype=np.int64, count=n),
+            np.fromiter(map(itemgetter("agent"), events), dtype=np.int64, count=n),
+            np.fromiter(map(itemgetter("sigil"), events), dtype=np.int64, count=n),
+            np.fromiter((parse_exotype(event.get("exotype")) for event in events),
+                        dtype=np.uint64, count=n))
+
+
 def sonify(events: List[Dict[str, Any]], out_path: str, ticks_per_step: int, bpm: int,
            channel: int, program: int) -> Dict[str, Any]:
-    """Convert events to MIDI using idempotent sigil-to-pitch logic.
+    """Convert event dicts to MIDI; see `sonify_columns`."""
+    return sonify_columns(event_columns(events), out_path, ticks_per_step, bpm, channel, program)
+
 
-    The main idempotent behavior is driven by recomputing `supporters`
-    per timestep and emitting note_on/note_off only when a pitch
-    transitions between zero and non-zero supporters.
+def sonify_columns(columns: EventColumns, out_path: str, ticks_per_step: int, bpm: int,
+                   channel: int, program: int) -> Dict[str, Any]:
+    """Convert event columns to MIDI using idempotent sigil-to-pitch logic.
+
+    The main idempotent behavior is driven by recomputing which pitches
+    have supporters per timestep (`supported`) and emitting
+    note_on/note_off only when a pitch transitions between zero and
+    non-zero supporters (`changed` against the `active` notes).
     """
-    if not events:
+    ts, agents, sigils, exotypes = columns
+    n = len(ts)
+    if not n:
         raise ValueError("No events to sonify.")
-    timeline: Dict[int, List[Dict[str, Any]]] = defaultdict(list)
-    for event in events:
-        timeline[event["t"]].append(event)
-    all_ts = sorted(timeline)
-    t_min, t_max = all_ts[0], all_ts[-1]
+
+    # Order by (t, agent). Logs usually arrive that way already; otherwise
+    # lexsort, which is stable, so an agent's repeats keep input order
+    in_order = np.all((ts[1:] > ts[:-1]) | ((ts[1:] == ts[:-1]) & (agents[1:] >= agents[:-1])))
+    if not in_order:
+        order = np.lexsort((agents, ts))
+        ts, agents, sigils, exotypes = ts[order], agents[order], sigils[order], exotypes[order]
+    t_min, t_max = int(ts[0]), int(ts[-1])
+
+    # Each timestep keeps the last event per agent, found where (t, agent) changes
+    last = np.ones(n, dtype=bool)
+    last[:-1] = (ts[1:] != ts[:-1]) | (agents[1:] != agents[:-1])
+    bounds = np.searchsorted(ts[last], np.arange(t_min, t_max + 2))
+
+    pc = popcounts(exotypes[last])
+    pc_sums = np.concatenate(([0], np.cumsum(pc)))
+    pc_sq_sums = np.concatenate(([0], np.cumsum(pc * pc)))
+    counts = np.diff(bounds)
+    mean_norm, var_norm = compute_stats(counts, pc_sums[bounds[1:]] - pc_sums[bounds[:-1]],
+                                        pc_sq_sums[bounds[1:]] - pc_sq_sums[bounds[:-1]])
+    velocities = np.clip(30 + (70 * var_norm).astype(np.int64), 0, 127).tolist()
+    cc_values = (127 * mean_norm).astype(np.int64).tolist()
+
+    # Sigils are clamped to 0-255, so every pitch comes from a 256-entry table
+    pitches = sigil_pitch_table()[np.clip(sigils[last], 0, MAX_SIGIL)]
+
+    # supported[step, pitch - low]: the pitch has at least one supporter at
+    # that step. The extra final row is empty, so every note still sounding
+    # at the last step turns off one step later.
+    steps = t_max - t_min + 1
+    low = int(pitches.min())
+    supported = np.zeros((steps + 1, int(pitches.max()) - low + 1), dtype=bool)
+    supported[np.repeat(np.arange(steps), counts), pitches - low] = True
+    active = np.zeros_like(supported)  # sounding before each step
+    active[1:] = supported[:-1]
+
+    # Notes only change where a pitch gains its first or loses its last
+    # supporter; nonzero walks them by step, then by pitch
+    changed = supported ^ active
+    change_steps, change_cols = np.nonzero(changed)
+    change_bounds = np.searchsorted(change_steps, np.arange(steps + 2)).tolist()
+    change_pitches = (change_cols + low).tolist()
+    change_on = supported[change_steps, change_cols].tolist()
 
     midi = mido.MidiFile(ticks_per_beat=480)
     track = mido.MidiTrack()
@@ -195,93 +322,50 @@ def sonify(events: List[Dict[str, Any]], out_path: str, ticks_per_step: int, bpm
     track.append(mido.MetaMessage("set_tempo", tempo=mido.bpm2tempo(bpm), time=0))
     track.append(mido.Message("program_change", program=program, channel=channel, time=0))
 
-    active_notes: Dict[int, int] = defaultdict(int)
-    distinct_pitches = set()
-    held_counts: List[int] = []
-    stability_hits = 0
-    prev_pitch_set: Optional[Tuple[int, ...]] = None
-
     pending_time = 0
     last_cc = None
-    prev_t = t_min
-
-    for t in range(t_min, t_max + 1):
-        delta_ticks = 0 if t == t_min else (t - prev_t) * ticks_per_step
-        pending_time += delta_ticks
-        prev_t = t
-
-        by_agent: Dict[int, Dict[str, Any]] = {}
-        for event in timeline.get(t, []):
-            by_agent[event["agent"]] = event
-
-        supporters: Dict[int, int] = defaultdict(int)
-        popcounts = []
-        for event in by_agent.values():
-            pitch = sigil_to_pitch(event["sigil"])
-            supporters[pitch] += 1
-            distinct_pitches.add(pitch)
-            exo = parse_exotype(event.get("exotype"))
-            popcounts.append(popcount(exo))
-
-        mean_norm, var_norm = compute_stats(popcounts)
-        velocity = 30 + int(70 * var_norm)
-        velocity = max(0, min(127, velocity))
-        cc_value = int(127 * mean_norm)
+    velocity = 0
+    has_events = (counts > 0).tolist()
+
+    for step in range(steps + 1):
+        if step:
+            pending_time += ticks_per_step
 
         messages: List[mido.Message] = []
-        if popcounts:
-            if last_cc is None or abs(cc_value - last_cc) > 2:
-                messages.append(mido.Message("control_change", control=74, value=cc_value, channel=channel, time=0))
-                last_cc = cc_value
-
-        all_pitches = set(active_notes) | set(supporters)
-        for pitch in sorted(all_pitches):
-            prev_count = active_notes.get(pitch, 0)
-            new_count = supporters.get(pitch, 0)
-            if prev_count == 0 and new_count > 0:
-                messages.append(mido.Message("note_on", note=pitch, velocity=velocity, channel=channel, time=0))
-            elif prev_count > 0 and new_count == 0:
-                messages.append(mido.Message("note_off", note=pitch, velocity=0, channel=channel, time=0))
-
-        pitch_set = tuple(sorted(supporters))
-        if prev_pitch_set is not None and pitch_set == prev_pitch_set:
-            stability_hits += 1
-        prev_pitch_set = pitch_set
-        held_counts.append(len(pitch_set))
+        if step < steps:
+            velocity = velocities[step]
+            cc_value = cc_values[step]
+
+            if has_events[step]:
+                if last_cc is None or abs(cc_value - last_cc) > 2:
+                    messages.append(mido.Message("control_change", control=74, value=cc_value, channel=channel, time=0))
+                    last_cc = cc_value
+
+        lo, hi = change_bounds[step], change_bounds[step + 1]
+        messages.extend(
+            mido.Message("note_on", note=pitch, velocity=velocity, channel=channel, time=0) if on
+            else mido.Message("note_off", note=pitch, velocity=0, channel=channel, time=0)
+            for pitch, on in zip(change_pitches[lo:hi], change_on[lo:hi])
+        )
 
         if messages:
             messages[0].time = pending_time
             pending_time = 0
-            for msg in messages:
-                track.append(msg)
-
-        active_notes = supporters
-
-    if active_notes:
-        pending_time += ticks_per_step
-        first = True
-        for pitch in sorted(active_notes):
-            track.append(mido.Message(
-                "note_off",
-                note=pitch,
-                velocity=0,
-                channel=channel,
-                time=pending_time if first else 0,
-            ))
-            first = False
-            pending_time = 0
+            track.extend(messages)
 
     midi.save(out_path)
 
-    timesteps = len(held_counts)
+    # A step is stable when its pitch set equals the previous step's
+    held_counts = supported[:steps].sum(axis=1)
+    stability_hits = int(np.count_nonzero(~changed[1:steps].any(axis=1)))
     stability_score = 0.0
-    if timesteps > 1:
-        stability_score = stability_hits / (timesteps - 1)
+    if steps > 1:
+        stability_score = stability_hits / (steps - 1)
 
     return {
-        "timesteps": timesteps,
-        "distinct_pitches": len(distinct_pitches),
-        "avg_held": sum(held_counts) / timesteps if timesteps else 0.0,
+        "timesteps": steps,
+        "distinct_pitches": int(np.count_nonzero(supported.any(axis=0))),
+        "avg_held": int(held_counts.sum()) / steps,
         "stability_score": stability_score,
     }
 
@@ -300,14 +384,14 @@ def parse_args() -> argparse.Namespace:
 def main() -> None:
     args = parse_args()
     if args.in_path:
-        events = load_events(args.in_path)
+        columns = load_event_columns(args.in_path)
         out_path = args.out_path or "out.mid"
     else:
-        events = generate_synthetic()
+        columns = event_columns(generate_synthetic())
         out_path = args.out_path or "demo.mid"
 
-    stats = sonify(
-        events=events,
+    stats = sonify_columns(
+        columns=columns,
         out_path=out_path,
         ticks_per_step=args.ticks,
         bpm=args.bpm,
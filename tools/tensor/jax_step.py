@@ -1,6 +1,10 @@
 #!/usr/bin/env python3
 """One-step bitplane CA evolution using JAX.
 
+Widths up to NUMPY_MAX_WIDTH are stepped with plain NumPy instead: for a
+single step that small, importing JAX and dispatching to XLA costs far
+more than the step itself, so JAX is only imported for wider inputs.
+
 Reads JSON on stdin:
 {
   "bitplanes": [[0,1,...], ...]  # 8 planes x width
@@ -15,8 +19,19 @@ Writes JSON:
 
 import json
 import sys
+from functools import lru_cache
+
+import numpy as np
+
+try:
+    import orjson  # optional: encodes the result array without .tolist()
+except ImportError:
+    orjson = None
 
-import jax.numpy as jnp
+NUMPY_MAX_WIDTH = 4096
+
+# Shift that puts plane p in bit 7 - p of a column's packed byte
+PLANE_SHIFTS = np.arange(7, -1, -1, dtype=np.uint8)[:, np.newaxis]
 
 
 def _normalize_bit(x):
@@ -30,24 +45,69 @@ def _normalize_bit(x):
 def _as_array(planes):
     if len(planes) != 8:
         raise ValueError(f"expected 8 bitplanes, got {len(planes)}")
+    # Fast path: equal-width planes of numeric/boolean 0s and 1s (the usual
+    # JSON input) convert and check in one pass. Anything else (strings,
+    # ragged or invalid planes) goes through the per-cell path below, which
+    # also produces the error messages.
+    try:
+        arr = np.asarray(planes)
+    except (TypeError, ValueError):
+        arr = None
+    if arr is not None and arr.ndim == 2 and arr.dtype.kind in "biuf":
+        if np.all((arr == 0) | (arr == 1)):
+            return arr.astype(np.int8)
     normalized = [[_normalize_bit(v) for v in plane] for plane in planes]
     widths = {len(p) for p in normalized}
     if len(widths) != 1:
         raise ValueError(f"bitplanes must have equal widths, got {sorted(widths)}")
-    return jnp.asarray(normalized, dtype=jnp.int32)
+    return np.asarray(normalized, dtype=np.int8)
 
 
 def _rule_table(rule_bits):
     if not isinstance(rule_bits, str) or len(rule_bits) != 8 or set(rule_bits) - {"0", "1"}:
         raise ValueError("rule-bits must be an 8-char binary string")
-    return jnp.asarray([1 if ch == "1" else 0 for ch in rule_bits], dtype=jnp.int32)
+    return np.asarray([1 if ch == "1" else 0 for ch in rule_bits], dtype=np.int8)
+
+
+def _step_numpy(bitplanes, rule_table, wrap, boundary_bit):
+    # bitplanes shape: (8, width). Each column's 8 planes are packed into
+    # one byte (plane 0 in the high bit) and the rule is applied with
+    # bitwise ops on uint64 words: 8 planes x 8 columns per operation.
+    width = bitplanes.shape[1]
+    if width == 0:
+        return bitplanes
+
+    # Rows: left neighbour, column, right neighbour; padded to whole words
+    packed = np.zeros((3, -(-width // 8) * 8), dtype=np.uint8)
+    left, center, right = packed
+    center[:width] = np.bitwise_or.reduce(bitplanes.view(np.uint8) << PLANE_SHIFTS, axis=0)
+    edge = 0xFF if boundary_bit else 0x00
+    left[0] = center[width - 1] if wrap else edge
+    left[1:width] = center[:width - 1]
+    right[width - 1] = center[0] if wrap else edge
+    right[:width - 1] = center[1:width]
+
+    # The rule as a sum of minterms: a plane's bit is set when its
+    # (left, center, right) neighbourhood is an index whose rule bit is 1
+    words = packed.view(np.uint64)
+    literals = [(~row, row) for row in words]
+    out = np.zeros_like(words[1])
+    for idx in np.flatnonzero(rule_table).tolist():
+        out |= literals[0][idx >> 2] & literals[1][(idx >> 1) & 1] & literals[2][idx & 1]
+
+    return (out.view(np.uint8)[np.newaxis, :width] >> PLANE_SHIFTS) & 1
 
 
 def _step(bitplanes, rule_table, wrap, boundary_bit):
+    import jax.numpy as jnp
+
     # bitplanes shape: (8, width)
     if bitplanes.shape[1] == 0:
         return bitplanes
 
+    bitplanes = jnp.asarray(bitplanes, dtype=jnp.int32)
+    rule_table = jnp.asarray(rule_table, dtype=jnp.int32)
+
     if wrap:
         left = jnp.roll(bitplanes, 1, axis=1)
         center = bitplanes
@@ -63,6 +123,18 @@ def _step(bitplanes, rule_table, wrap, boundary_bit):
     return jnp.take(rule_table, idx)
 
 
+@lru_cache(maxsize=None)
+def _jitted_step():
+    """`_step` traced and compiled as one XLA computation.
+
+    wrap and boundary_bit are static, so each combination compiles once
+    and the shape branches in `_step` resolve at trace time.
+    """
+    import jax
+
+    return jax.jit(_step, static_argnames=("wrap", "boundary_bit"))
+
+
 def main():
     raw = sys.stdin.read()
     data = json.loads(raw)
@@ -72,9 +144,18 @@ def main():
     wrap = bool(data.get("wrap?", True))
     boundary_bit = _normalize_bit(data.get("boundary-bit", 0))
 
-    next_bitplanes = _step(bitplanes, rule_table, wrap, boundary_bit)
-    out = {"bitplanes-next": next_bitplanes.tolist()}
-    sys.stdout.write(json.dumps(out))
+    if bitplanes.shape[1] <= NUMPY_MAX_WIDTH:
+        next_bitplanes = _step_numpy(bitplanes, rule_table, wrap, boundary_bit)
+    else:
+        next_bitplanes = _jitted_step()(bitplanes, rule_table,
+                                        wrap=wrap, boundary_bit=boundary_bit)
+    next_bitplanes = np.ascontiguousarray(next_bitplanes)
+    if orjson is not None:
+        out = {"bitplanes-next": next_bitplanes}
+        sys.stdout.buffer.write(orjson.dumps(out, option=orjson.OPT_SERIALIZE_NUMPY))
+    else:
+        out = {"bitplanes-next": next_bitplanes.tolist()}
+        sys.stdout.write(json.dumps(out))
 
 
 if __name__ == "__main__":
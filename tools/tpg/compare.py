@@ -10,14 +10,22 @@ This script runs self-contained (no Clojure subprocess needed) using
 a simplified TPG routing model that mirrors the Clojure implementation.
 """
 
+import hashlib
 import json
+import multiprocessing
+import os
 import time
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from operator import itemgetter
+from statistics import fmean
+
 import numpy as np
-from copy import deepcopy
 
 # Import our tools
-from smt_analyzer import analyze as smt_analyze, evaluate_tpg_at_point
-from jax_refine import refine_weights as jax_refine
+from smt_analyzer import analyze as smt_analyze, _get_config_val, _get_team_id
+from jax_refine import refine_weights as jax_refine, tpg_to_soa
 
 # ============================================================================
 # TPG DEFINITIONS (matching Clojure seed TPGs)
@@ -100,6 +108,80 @@ ALL_OPERATORS = [
 ]
 
 DIAG_DIM = 6
+DIAG_KEYS = ["entropy", "change", "autocorr", "diversity",
+             "phenotype_coupling", "damage_spread"]
+
+# VERIFIER_SPEC as arrays over the diagnostic indices it constrains
+VERIFIER_INDICES = np.array([DIAG_KEYS.index(k) for k in VERIFIER_SPEC if k in DIAG_KEYS])
+VERIFIER_CENTERS = np.array([VERIFIER_SPEC[k][0] for k in VERIFIER_SPEC if k in DIAG_KEYS])
+VERIFIER_WIDTHS = np.array([VERIFIER_SPEC[k][1] for k in VERIFIER_SPEC if k in DIAG_KEYS])
+
+# Diagnostic each operator pushes toward (simplified: operators push
+# diagnostics toward their specialty)
+OP_EFFECT = {
+    "expansion": [0.7, 0.4, 0.3, 0.5, 0.0, 0.3],
+    "conservation": [0.3, 0.1, 0.8, 0.3, 0.0, 0.1],
+    "adaptation": [0.5, 0.2, 0.5, 0.4, 0.0, 0.2],
+    "momentum": [0.5, 0.3, 0.4, 0.4, 0.0, 0.4],
+    "conditional": [0.5, 0.2, 0.5, 0.3, 0.3, 0.2],
+    "differentiation": [0.5, 0.3, 0.4, 0.6, 0.0, 0.3],
+    "transformation": [0.7, 0.5, 0.2, 0.5, 0.0, 0.5],
+    "consolidation": [0.4, 0.1, 0.7, 0.3, 0.0, 0.1],
+}
+DEFAULT_OP_EFFECT = [0.5] * DIAG_DIM
+
+# Integer operator codes for compiled routing: OP_EFFECT_ROWS[OP_ID[op]]
+# is op's target, and UNKNOWN_OP indexes the default for any other name
+OP_ID = {op: i for i, op in enumerate(ALL_OPERATORS)}
+UNKNOWN_OP = len(ALL_OPERATORS)
+OP_EFFECT_ROWS = [OP_EFFECT.get(op, DEFAULT_OP_EFFECT) for op in ALL_OPERATORS]
+OP_EFFECT_ROWS.append(DEFAULT_OP_EFFECT)
+ADAPTATION_OP = OP_ID["adaptation"]
+
+
+@lru_cache(maxsize=4096)
+def _smt_analyze_json(tpg_json):
+    return smt_analyze({"tpg": json.loads(tpg_json), "verifier_spec": VERIFIER_SPEC})
+
+
+def smt_analyze_cached(tpg):
+    """SMT-analyze a TPG against VERIFIER_SPEC, reusing earlier results.
+
+    The cache key is the TPG's full content, weights included: which
+    programs win, and so reachability and dead programs, depend on them.
+    """
+    return _smt_analyze_json(json.dumps(tpg, sort_keys=True, default=np.ndarray.tolist))
+
+
+def structurally_reachable_operators(tpg):
+    """Operators that programs in teams reachable from the root point at.
+
+    A graph walk with no Z3: ignores weights, so it over-approximates
+    smt_analyze's reachable_operators ("adaptation", the routing
+    fallback, is always included). An operator missing from it is
+    certainly unreachable.
+    """
+    teams = {_get_team_id(team): team for team in tpg["teams"]}
+    root_id = _get_config_val(tpg.get("config", {}), "root_team")
+    if not root_id:
+        root_id = _get_team_id(tpg["teams"][0]) if tpg["teams"] else None
+
+    operators = {"adaptation"}
+    seen = set()
+    frontier = [root_id]
+    while frontier:
+        team_id = frontier.pop()
+        if team_id in seen or team_id not in teams:
+            continue
+        seen.add(team_id)
+        for prog in teams[team_id].get("programs", []):
+            action = prog.get("action", {})
+            action_type = action.get("type", "operator")
+            if action_type == "operator":
+                operators.add(action.get("target", "adaptation"))
+            elif action_type == "team":
+                frontier.append(action.get("target"))
+    return operators
 
 
 # ============================================================================
@@ -111,7 +193,7 @@ def random_tpg(rng):
     n_progs = rng.randint(3, 8)
     programs = []
     for i in range(n_progs):
-        w = (rng.random(DIAG_DIM) * 2 - 1).tolist()
+        w = rng.random(DIAG_DIM) * 2 - 1
         b = float(rng.random() * 0.5 - 0.25)
         op = rng.choice(ALL_OPERATORS)
         programs.append({
@@ -127,21 +209,127 @@ def random_tpg(rng):
     }
 
 
+def clone_tpg(tpg):
+    """Copy a TPG down to its program dicts, sharing everything below.
+
+    Weight lists, actions and config are shared with the original, so
+    callers must replace them rather than mutate them in place.
+    """
+    return {
+        **tpg,
+        "teams": [
+            {**team, "programs": [dict(prog) for prog in team["programs"]]}
+            for team in tpg["teams"]
+        ]
+    }
+
+
 def mutate_tpg(tpg, rng, sigma=0.15):
     """Mutate a TPG by perturbing weights/biases."""
-    tpg = deepcopy(tpg)
+    tpg = clone_tpg(tpg)
     for team in tpg["teams"]:
         for prog in team["programs"]:
             if rng.random() < 0.5:
-                noise = (rng.randn(len(prog["weights"])) * sigma).tolist()
-                prog["weights"] = [w + n for w, n in zip(prog["weights"], noise)]
+                noise = rng.randn(len(prog["weights"])) * sigma
+                prog["weights"] = np.asarray(prog["weights"]) + noise
             if rng.random() < 0.3:
                 prog["bias"] += float(rng.randn() * sigma * 0.5)
             if rng.random() < 0.1:
-                prog["action"]["target"] = rng.choice(ALL_OPERATORS)
+                prog["action"] = {**prog["action"],
+                                  "target": rng.choice(ALL_OPERATORS)}
     return tpg
 
 
+def compile_routing(tpg):
+    """Flatten a TPG into per-team program rows for route_at_point.
+
+    Each team's weights are stacked into one zero-padded
+    (n_programs, DIAG_DIM) matrix and handed back as rows of floats:
+    at DIAG_DIM = 6 a scalar loop over them beats per-team NumPy calls.
+    Actions become (op_code, team_id) pairs, op_code None for team jumps.
+    """
+    teams = {}
+    for team in tpg["teams"]:
+        programs = team["programs"]
+        weights = np.zeros((len(programs), DIAG_DIM))
+        for i, prog in enumerate(programs):
+            w = np.asarray(prog["weights"], dtype=float)[:DIAG_DIM]
+            weights[i, :len(w)] = w
+        teams[_get_team_id(team)] = list(zip(
+            weights.tolist(),
+            [float(prog.get("bias", 0.0)) for prog in programs],
+            [_compile_action(prog["action"]) for prog in programs]))
+
+    config = tpg.get("config", {})
+    root_id = _get_config_val(config, "root_team")
+    if not root_id:
+        root_id = _get_team_id(tpg["teams"][0]) if tpg["teams"] else None
+    return {"teams": teams, "root": root_id,
+            "max_depth": _get_config_val(config, "max_depth", 4)}
+
+
+def _compile_action(action):
+    """(op_code, team_id) for a program action, as used by route_at_point."""
+    if not action:
+        return None
+    if action["type"] == "operator":
+        return OP_ID.get(action["target"], UNKNOWN_OP), None
+    elif action["type"] == "team":
+        return None, action["target"]
+    return ADAPTATION_OP, None
+
+
+def route_at_point(routing, point):
+    """Operator code a compiled TPG routes to at a diagnostic point (a list).
+
+    Same operator as smt_analyzer.evaluate_tpg_at_point on the TPG.
+    """
+    teams = routing["teams"]
+    current_id = routing["root"]
+    visited = set()
+
+    for depth in range(routing["max_depth"] + 1):
+        if current_id in visited or current_id not in teams:
+            return ADAPTATION_OP
+        visited.add(current_id)
+
+        # Find winning program (highest bid, ties to the later program)
+        best_bid = float('-inf')
+        best_action = None
+        for weights, bid, action in teams[current_id]:
+            for w, x in zip(weights, point):
+                bid += w * x
+            if bid >= best_bid:
+                best_bid = bid
+                best_action = action
+
+        if not best_action:
+            return ADAPTATION_OP
+
+        op_code, current_id = best_action
+        if op_code is not None:
+            return op_code
+
+    return ADAPTATION_OP  # depth limit
+
+
+def _simulate_run(routing, diag, noise, alpha=0.3):
+    """Trace of one synthetic run from diag, one diagnostic per noise row.
+
+    Each generation routes the current diagnostic, then moves it toward
+    the chosen operator's target plus noise, clipped to [0, 1]. Works on
+    plain floats: at DIAG_DIM = 6, per-generation NumPy calls cost more
+    than the arithmetic.
+    """
+    trace = []
+    for noise_row in noise:
+        trace.append(diag)
+        target = OP_EFFECT_ROWS[route_at_point(routing, diag)]
+        diag = [min(max(d * (1 - alpha) + t * alpha + n, 0.0), 1.0)
+                for d, t, n in zip(diag, target, noise_row)]
+    return trace
+
+
 def evaluate_tpg_synthetic(tpg, rng, n_runs=5, n_gens=20):
     """Evaluate a TPG using synthetic diagnostic traces.
 
@@ -153,63 +341,39 @@ def evaluate_tpg_synthetic(tpg, rng, n_runs=5, n_gens=20):
     """
     all_sats = []
     all_traces = []
+    routing = compile_routing(tpg)
 
     for run in range(n_runs):
-        trace = []
-        # Start from a random diagnostic
-        diag = rng.random(DIAG_DIM)
-        sat_count = 0
-        total_checks = 0
-
-        for gen in range(n_gens):
-            # Route through TPG
-            op = evaluate_tpg_at_point(tpg, diag.tolist())
-
-            # Check verifier satisfaction for this diagnostic
-            for vkey, (center, width) in VERIFIER_SPEC.items():
-                idx = ["entropy", "change", "autocorr", "diversity",
-                       "phenotype_coupling", "damage_spread"].index(vkey) \
-                    if vkey in ["entropy", "change", "autocorr", "diversity",
-                                "phenotype_coupling", "damage_spread"] else -1
-                if idx >= 0:
-                    score = max(0.0, 1.0 - abs(diag[idx] - center) / width)
-                    if score > 0:
-                        sat_count += 1
-                    total_checks += 1
-
-            trace.append(diag.tolist())
-
-            # Simulate operator effect on next diagnostic
-            # (simplified: operators push diagnostics toward their specialty)
-            next_diag = diag.copy()
-            op_effect = {
-                "expansion": np.array([0.7, 0.4, 0.3, 0.5, 0.0, 0.3]),
-                "conservation": np.array([0.3, 0.1, 0.8, 0.3, 0.0, 0.1]),
-                "adaptation": np.array([0.5, 0.2, 0.5, 0.4, 0.0, 0.2]),
-                "momentum": np.array([0.5, 0.3, 0.4, 0.4, 0.0, 0.4]),
-                "conditional": np.array([0.5, 0.2, 0.5, 0.3, 0.3, 0.2]),
-                "differentiation": np.array([0.5, 0.3, 0.4, 0.6, 0.0, 0.3]),
-                "transformation": np.array([0.7, 0.5, 0.2, 0.5, 0.0, 0.5]),
-                "consolidation": np.array([0.4, 0.1, 0.7, 0.3, 0.0, 0.1]),
-            }
-            target = op_effect.get(op, np.array([0.5] * DIAG_DIM))
-            # Move toward target with noise
-            alpha = 0.3
-            noise = rng.randn(DIAG_DIM) * 0.1
-            next_diag = np.clip(diag * (1 - alpha) + target * alpha + noise, 0, 1)
-            diag = next_diag
-
-        sat = sat_count / max(1, total_checks)
+        # Start from a random diagnostic; draw the run's noise up front
+        # (the same stream as one randn(DIAG_DIM) per generation)
+        diag = rng.random(DIAG_DIM).tolist()
+        noise = (rng.randn(n_gens, DIAG_DIM) * 0.1).tolist()
+        trace = _simulate_run(routing, diag, noise)
+
+        # Verifier band scores for every diagnostic in the run at once
+        values = np.array(trace).reshape(-1, DIAG_DIM)[:, VERIFIER_INDICES]
+        scores = 1.0 - np.abs(values - VERIFIER_CENTERS) / VERIFIER_WIDTHS
+        sat = np.count_nonzero(scores > 0) / max(1, scores.size)
         all_sats.append(sat)
         all_traces.append(trace)
 
     return float(np.mean(all_sats)), all_traces
 
 
-def evolve_pure(pop_size=8, n_offspring=8, n_gens=10, seed=42):
-    """Pure evolutionary search baseline."""
+def _evolve(pop_size, n_offspring, n_gens, seed, assess, gate=None, refine=None):
+    """Generational loop shared by the three evolvers.
+
+    assess(tpg, rng) -> (fitness, extra) scores a candidate; extra is
+    kept alongside it in pop_fitness. gate(child) -> bool, if given,
+    runs before a child is assessed, and each child gets up to three
+    attempts' worth of budget. refine(gen, pop_fitness, rng), if given,
+    runs after selection, may replace members in place, and returns
+    (evaluations, refinements) it spent.
+    """
     rng = np.random.RandomState(seed)
     evals = 0
+    rejections = 0
+    refinements = 0
 
     # Initial population
     pop = [SIMPLE_TPG, HIERARCHICAL_TPG]
@@ -219,29 +383,38 @@ def evolve_pure(pop_size=8, n_offspring=8, n_gens=10, seed=42):
     # Evaluate
     pop_fitness = []
     for tpg in pop:
-        sat, _ = evaluate_tpg_synthetic(tpg, rng)
-        pop_fitness.append((tpg, sat))
+        pop_fitness.append((tpg, *assess(tpg, rng)))
         evals += 1
 
     history = []
+    max_attempts = n_offspring * 3 if gate else n_offspring
 
     for gen in range(n_gens):
         # Generate offspring
         offspring = []
-        for _ in range(n_offspring):
+        attempts = 0
+        while len(offspring) < n_offspring and attempts < max_attempts:
+            attempts += 1
             parent = pop_fitness[rng.randint(len(pop_fitness))][0]
             child = mutate_tpg(parent, rng)
-            sat, _ = evaluate_tpg_synthetic(child, rng)
-            offspring.append((child, sat))
+            if gate and not gate(child):
+                rejections += 1
+                continue
+            offspring.append((child, *assess(child, rng)))
             evals += 1
 
         # Select survivors
         combined = pop_fitness + offspring
-        combined.sort(key=lambda x: -x[1])
+        combined.sort(key=itemgetter(1), reverse=True)
         pop_fitness = combined[:pop_size]
 
+        if refine:
+            refine_evals, refined = refine(gen, pop_fitness, rng)
+            evals += refine_evals
+            refinements += refined
+
         best_sat = pop_fitness[0][1]
-        mean_sat = np.mean([s for _, s in pop_fitness])
+        mean_sat = fmean(s for _, s, _ in pop_fitness)
         history.append({"gen": gen, "best": best_sat, "mean": mean_sat})
 
     return {
@@ -249,82 +422,70 @@ def evolve_pure(pop_size=8, n_offspring=8, n_gens=10, seed=42):
         "best_satisfaction": pop_fitness[0][1],
         "history": history,
         "evaluations": evals
-    }
+    }, rejections, refinements
 
 
-def evolve_smt_guided(pop_size=8, n_offspring=8, n_gens=10, seed=42):
-    """Evolution with SMT-based candidate pruning.
+def evolve_pure(pop_size=8, n_offspring=8, n_gens=10, seed=42):
+    """Pure evolutionary search baseline."""
+    def assess(tpg, rng):
+        sat, _ = evaluate_tpg_synthetic(tpg, rng)
+        return sat, None
 
-    Before evaluating a candidate (expensive MMCA runs), check its
-    structural quality with SMT. Reject candidates with:
-    - More than 3 unreachable operators
-    - All programs dead in any team
-    - No verifier-satisfiable region
-    """
-    rng = np.random.RandomState(seed)
-    evals = 0
-    smt_rejections = 0
+    result, _, _ = _evolve(pop_size, n_offspring, n_gens, seed, assess)
+    return result
 
-    # Initial population
-    pop = [SIMPLE_TPG, HIERARCHICAL_TPG]
-    while len(pop) < pop_size:
-        pop.append(random_tpg(rng))
 
-    # SMT-analyze and evaluate
-    pop_fitness = []
-    for tpg in pop:
-        analysis = smt_analyze({"tpg": tpg, "verifier_spec": VERIFIER_SPEC})
-        sat, _ = evaluate_tpg_synthetic(tpg, rng)
-        # Bonus for structural quality
-        n_reachable = len(analysis.get("reachable_operators", []))
-        n_dead = len(analysis.get("dead_programs", []))
-        structural_bonus = 0.05 * (n_reachable / 8.0) - 0.02 * n_dead
-        pop_fitness.append((tpg, sat + structural_bonus, analysis))
-        evals += 1
+def _smt_assess(tpg, rng):
+    """Synthetic satisfaction plus a bonus for structural quality."""
+    analysis = smt_analyze_cached(tpg)
+    sat, _ = evaluate_tpg_synthetic(tpg, rng)
+    n_reachable = len(analysis.get("reachable_operators", []))
+    n_dead = len(analysis.get("dead_programs", []))
+    structural_bonus = 0.05 * (n_reachable / 8.0) - 0.02 * n_dead
+    return sat + structural_bonus, analysis
 
-    history = []
 
-    for gen in range(n_gens):
-        offspring = []
-        attempts = 0
-        while len(offspring) < n_offspring and attempts < n_offspring * 3:
-            attempts += 1
-            parent = pop_fitness[rng.randint(len(pop_fitness))][0]
-            child = mutate_tpg(parent, rng)
+def _smt_gate(child):
+    """Whether a child passes the SMT structural check."""
+    # Structural pre-check: with more than 5 operators missing from
+    # every route, the SMT gate would reject the child anyway
+    n_routed = len(structurally_reachable_operators(child).intersection(ALL_OPERATORS))
+    if len(ALL_OPERATORS) - n_routed > 5:
+        return False
 
-            # SMT gate: quick structural check
-            analysis = smt_analyze({"tpg": child, "verifier_spec": VERIFIER_SPEC})
-            n_unreachable = len(analysis.get("unreachable_operators", []))
-            n_dead = len(analysis.get("dead_programs", []))
-            verifier_sat = analysis.get("verifier_satisfiable", False)
+    # SMT gate: quick structural check; _smt_assess reuses the cached analysis
+    analysis = smt_analyze_cached(child)
+    n_unreachable = len(analysis.get("unreachable_operators", []))
+    verifier_sat = analysis.get("verifier_satisfiable", False)
 
-            # Reject if structurally degenerate
-            if n_unreachable > 5 or (not verifier_sat and n_unreachable > 3):
-                smt_rejections += 1
-                continue
+    # Reject if structurally degenerate
+    return not (n_unreachable > 5 or (not verifier_sat and n_unreachable > 3))
 
-            # Passes SMT gate → evaluate
-            sat, _ = evaluate_tpg_synthetic(child, rng)
-            n_reachable = len(analysis.get("reachable_operators", []))
-            structural_bonus = 0.05 * (n_reachable / 8.0) - 0.02 * n_dead
-            offspring.append((child, sat + structural_bonus, analysis))
-            evals += 1
 
-        combined = pop_fitness + offspring
-        combined.sort(key=lambda x: -x[1])
-        pop_fitness = combined[:pop_size]
+def evolve_smt_guided(pop_size=8, n_offspring=8, n_gens=10, seed=42):
+    """Evolution with SMT-based candidate pruning.
 
-        best_sat = pop_fitness[0][1]
-        mean_sat = np.mean([s for _, s, _ in pop_fitness])
-        history.append({"gen": gen, "best": best_sat, "mean": mean_sat})
+    Before evaluating a candidate (expensive MMCA runs), check its
+    structural quality with SMT. Reject candidates with:
+    - More than 3 unreachable operators
+    - All programs dead in any team
+    - No verifier-satisfiable region
+    """
+    result, smt_rejections, _ = _evolve(pop_size, n_offspring, n_gens, seed,
+                                        _smt_assess, gate=_smt_gate)
+    result["smt_rejections"] = smt_rejections
+    return result
 
-    return {
-        "best_tpg": pop_fitness[0][0],
-        "best_satisfaction": pop_fitness[0][1],
-        "history": history,
-        "evaluations": evals,
-        "smt_rejections": smt_rejections
-    }
+
+def _refine_candidate(tpg, traces):
+    """JAX-refine one candidate; runs in a worker process."""
+    return jax_refine({
+        "tpg": tpg,
+        "soa": tpg_to_soa(tpg),
+        "traces": traces,
+        "verifier_spec": VERIFIER_SPEC,
+        "config": {"n_steps": 30, "learning_rate": 0.01}
+    }, {"n_steps": 30, "learning_rate": 0.01})
 
 
 def evolve_jax_refined(pop_size=8, n_offspring=8, n_gens=10, seed=42):
@@ -333,49 +494,40 @@ def evolve_jax_refined(pop_size=8, n_offspring=8, n_gens=10, seed=42):
     After evaluating a generation, take the top candidates and
     refine their weights using JAX gradient descent. The refined
     weights are injected back into the population.
-    """
-    rng = np.random.RandomState(seed)
-    evals = 0
-    jax_refinements = 0
-
-    # Initial population
-    pop = [SIMPLE_TPG, HIERARCHICAL_TPG]
-    while len(pop) < pop_size:
-        pop.append(random_tpg(rng))
-
-    # Evaluate
-    pop_fitness = []
-    for tpg in pop:
-        sat, traces = evaluate_tpg_synthetic(tpg, rng)
-        pop_fitness.append((tpg, sat, traces))
-        evals += 1
-
-    history = []
-
-    for gen in range(n_gens):
-        offspring = []
-        for _ in range(n_offspring):
-            parent, _, _ = pop_fitness[rng.randint(len(pop_fitness))]
-            child = mutate_tpg(parent, rng)
-            sat, traces = evaluate_tpg_synthetic(child, rng)
-            offspring.append((child, sat, traces))
-            evals += 1
-
-        combined = pop_fitness + offspring
-        combined.sort(key=lambda x: -x[1])
-        pop_fitness = combined[:pop_size]
 
+    Refinement is deterministic and uses no RNG, so the candidates are
+    refined concurrently in a persistent worker pool, then evaluated in
+    order as before.
+    """
+    # A candidate that stays on top without being improved comes back
+    # with the same weights and traces, and refinement is deterministic,
+    # so its earlier result can be reused as-is
+    refined_cache = OrderedDict()
+
+    def refine_key(tpg, traces):
+        payload = json.dumps([tpg, traces], sort_keys=True, default=np.ndarray.tolist)
+        return hashlib.blake2b(payload.encode(), digest_size=16).digest()
+
+    def refine(gen, pop_fitness, rng):
+        evals = 0
+        jax_refinements = 0
         # JAX refinement: refine top 2 candidates every 3 generations
         if gen % 3 == 2:
-            for idx in range(min(2, len(pop_fitness))):
+            keys = [refine_key(tpg, traces) for tpg, _, traces in pop_fitness[:2]]
+            futures = [None if key in refined_cache
+                       else executor.submit(_refine_candidate, tpg, traces)
+                       for key, (tpg, _, traces) in zip(keys, pop_fitness)]
+            for idx, future in enumerate(futures):
                 tpg, sat, traces = pop_fitness[idx]
                 try:
-                    result = jax_refine({
-                        "tpg": tpg,
-                        "traces": traces,
-                        "verifier_spec": VERIFIER_SPEC,
-                        "config": {"n_steps": 30, "learning_rate": 0.01}
-                    }, {"n_steps": 30, "learning_rate": 0.01})
+                    if future is None:
+                        result = refined_cache[keys[idx]]
+                        refined_cache.move_to_end(keys[idx])
+                    else:
+                        result = future.result()
+                        refined_cache[keys[idx]] = result
+                        if len(refined_cache) > 32:
+                            refined_cache.popitem(last=False)
 
                     # Inject refined weights
                     if result.get("refined_weights"):
@@ -389,23 +541,20 @@ def evolve_jax_refined(pop_size=8, n_offspring=8, n_gens=10, seed=42):
                             jax_refinements += 1
                 except Exception as e:
                     pass  # JAX failure is non-fatal
+        return evals, jax_refinements
 
-        best_sat = pop_fitness[0][1]
-        mean_sat = np.mean([s for _, s, _ in pop_fitness])
-        history.append({"gen": gen, "best": best_sat, "mean": mean_sat})
-
-    return {
-        "best_tpg": pop_fitness[0][0],
-        "best_satisfaction": pop_fitness[0][1],
-        "history": history,
-        "evaluations": evals,
-        "jax_refinements": jax_refinements
-    }
+    # spawn, not fork: JAX is multithreaded once imported
+    with ProcessPoolExecutor(max_workers=min(2, os.cpu_count() or 1),
+                             mp_context=multiprocessing.get_context("spawn")) as executor:
+        result, _, jax_refinements = _evolve(pop_size, n_offspring, n_gens, seed,
+                                             evaluate_tpg_synthetic, refine=refine)
+    result["jax_refinements"] = jax_refinements
+    return result
 
 
 def apply_refined_weights(tpg, refined_weights):
     """Apply JAX-refined weights back to a TPG."""
-    tpg = deepcopy(tpg)
+    tpg = clone_tpg(tpg)
     for team in tpg["teams"]:
         tid = team["team/id"]
         if tid in refined_weights:
@@ -505,7 +654,7 @@ def run_comparison():
 
     for name, result in [("Pure Evo", pure), ("SMT-Guided", smt), ("JAX-Refined", jax_result)]:
         tpg = result["best_tpg"]
-        analysis = smt_analyze({"tpg": tpg, "verifier_spec": VERIFIER_SPEC})
+        analysis = smt_analyze_cached(tpg)
         n_reachable = len(analysis.get("reachable_operators", []))
         n_dead = len(analysis.get("dead_programs", []))
         sat = analysis.get("verifier_satisfiable", False)
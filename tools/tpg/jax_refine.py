@@ -16,7 +16,7 @@ Input JSON:
     tpg: TPG structure with teams, programs, config
     traces: list of diagnostic trace arrays (from MMCA runs)
     verifier_spec: {verifier_key: [center, width], ...}
-    config: {learning_rate, n_steps, temperature, ...}
+    config: {learning_rate, n_steps, temperature, weight_dtype, ...}
 
 Output JSON:
     original_satisfaction: float
@@ -30,6 +30,7 @@ Output JSON:
 import json
 import sys
 import time
+from functools import partial
 
 import jax
 import jax.numpy as jnp
@@ -55,16 +56,19 @@ DEFAULT_SPEC = {
 }
 
 
-def parse_tpg(data):
-    """Parse TPG from JSON into JAX-friendly arrays."""
-    tpg = data["tpg"]
+def tpg_to_soa(tpg):
+    """Flatten a TPG's programs into structure-of-arrays form.
+
+    Returns a dict with W float32[N, DIAG_DIM], b float32[N],
+    team_ids int32[N] (team index of each program), and the parallel
+    program_info/team_info lists used to route and to rebuild output.
+    """
     teams = tpg.get("teams", [])
+    n = sum(len(team.get("programs", [])) for team in teams)
 
-    # Flatten all programs into a weight matrix
-    # We need to track which programs belong to which teams
-    # and what their routing structure is
-    all_weights = []
-    all_biases = []
+    W = np.zeros((n, DIAG_DIM), dtype=np.float32)
+    b = np.zeros(n, dtype=np.float32)
+    team_ids = np.zeros(n, dtype=np.int32)
     program_info = []  # (team_idx, prog_idx, action_type, action_target)
     team_info = []     # (team_id, n_programs, start_idx)
 
@@ -74,11 +78,10 @@ def parse_tpg(data):
         programs = team.get("programs", [])
         start_idx = idx
         for pi, prog in enumerate(programs):
-            weights = prog.get("weights", [0.0] * DIAG_DIM)
-            bias = prog.get("bias", 0.0)
             action = prog.get("action", {})
-            all_weights.append(weights)
-            all_biases.append(bias)
+            W[idx] = prog.get("weights", [0.0] * DIAG_DIM)
+            b[idx] = prog.get("bias", 0.0)
+            team_ids[idx] = ti
             program_info.append({
                 "team_idx": ti,
                 "prog_idx": pi,
@@ -94,10 +97,23 @@ def parse_tpg(data):
             "start_idx": start_idx
         })
 
-    W = jnp.array(all_weights, dtype=jnp.float32)  # (n_programs, DIAG_DIM)
-    b = jnp.array(all_biases, dtype=jnp.float32)    # (n_programs,)
+    return {"W": W, "b": b, "team_ids": team_ids,
+            "program_info": program_info, "team_info": team_info}
+
+
+def parse_tpg(data):
+    """Parse TPG from JSON into JAX-friendly arrays.
+
+    Uses data["soa"] when the caller has already flattened the TPG
+    with tpg_to_soa, otherwise flattens data["tpg"].
+    """
+    tpg = data["tpg"]
+    soa = data.get("soa") or tpg_to_soa(tpg)
+
+    W = jnp.asarray(soa["W"], dtype=jnp.float32)  # (n_programs, DIAG_DIM)
+    b = jnp.asarray(soa["b"], dtype=jnp.float32)  # (n_programs,)
 
-    return W, b, program_info, team_info, tpg
+    return W, b, soa["program_info"], soa["team_info"], tpg
 
 
 def parse_traces(data):
@@ -166,6 +182,13 @@ def build_routing_fn(team_info, program_info):
 
     For a flat TPG (1 team), this is straightforward.
     For hierarchical TPGs, we approximate with a 2-level softmax.
+
+    Returns (team_program_indices, team_program_mask, team_program_ops,
+    root_team_routes): program indices padded to int32[n_teams,
+    max_programs], the bool mask of real (unpadded) lanes, the one-hot
+    float32[n_teams, max_programs, n_operators] of programs that act as
+    an operator, and the one-hot float32[max_programs, n_teams] of root
+    programs that route to a team.
     """
     # Build team structure: for each team, which program indices belong to it?
     team_program_indices = []
@@ -196,11 +219,31 @@ def build_routing_fn(team_info, program_info):
                 actions.append(("team", target_ti))
         team_program_actions.append(actions)
 
-    return team_program_indices, team_program_actions
-
-
-def soft_route(W, b, diagnostic, team_program_indices, team_program_actions,
-               temperature=0.1):
+    # Pad to one rectangle so soft_route can gather all bids at once
+    max_programs = max((len(indices) for indices in team_program_indices), default=0)
+    padded = np.zeros((len(team_program_indices), max_programs), dtype=np.int32)
+    mask = np.zeros((len(team_program_indices), max_programs), dtype=bool)
+    for ti, indices in enumerate(team_program_indices):
+        padded[ti, :len(indices)] = indices
+        mask[ti, :len(indices)] = True
+
+    # Routing as dense one-hot maps, so soft_route is two contractions
+    n_teams = len(team_program_actions)
+    ops = np.zeros((n_teams, max_programs, len(ALL_OPERATORS)), dtype=np.float32)
+    root_routes = np.zeros((max_programs, n_teams), dtype=np.float32)
+    for ti, actions in enumerate(team_program_actions):
+        for pi, (action_type, action_idx) in enumerate(actions):
+            if action_type == "operator":
+                ops[ti, pi, action_idx] = 1.0
+            elif ti == 0 and action_idx is not None:
+                root_routes[pi, action_idx] = 1.0
+
+    return (jnp.asarray(padded), jnp.asarray(mask),
+            jnp.asarray(ops), jnp.asarray(root_routes))
+
+
+def soft_route(W, b, diagnostic, team_program_indices, team_program_mask,
+               team_program_ops, root_team_routes, temperature=0.1):
     """Differentiable soft routing through the TPG.
 
     Returns a probability distribution over operators (length 8).
@@ -208,40 +251,26 @@ def soft_route(W, b, diagnostic, team_program_indices, team_program_actions,
     Uses softmax over bids as a differentiable approximation to argmax.
     For hierarchical TPGs, multiplies probabilities through the routing chain.
     """
-    n_operators = len(ALL_OPERATORS)
-    n_teams = len(team_program_indices)
-
     # Compute all bids: W @ diagnostic + b
-    all_bids = W @ diagnostic + b  # (n_programs,)
+    # W may be bfloat16; the bids are accumulated in float32
+    all_bids = (W @ diagnostic.astype(W.dtype)).astype(jnp.float32) + b
 
     # Start from root team (team 0)
     # For each team, compute softmax over its programs' bids
     # Then distribute probability to actions
 
-    # Initialize operator probability accumulator
-    op_probs = jnp.zeros(n_operators)
-
-    # Process root team (team 0)
-    root_indices = team_program_indices[0]
-    root_bids = jnp.array([all_bids[i] for i in root_indices])
-    root_probs = jax.nn.softmax(root_bids / temperature)
+    # Softmax over every team's bids in one gather; padded lanes get
+    # no probability
+    team_bids = jnp.take(all_bids, team_program_indices, axis=0) / temperature
+    team_probs = jax.nn.softmax(
+        jnp.where(team_program_mask, team_bids, -1e9), axis=-1)
 
-    for pi, (action_type, action_idx) in enumerate(team_program_actions[0]):
-        if action_type == "operator":
-            op_probs = op_probs.at[action_idx].add(root_probs[pi])
-        elif action_type == "team" and action_idx is not None and action_idx < n_teams:
-            # Route to sub-team: compute sub-team's operator distribution
-            sub_indices = team_program_indices[action_idx]
-            sub_bids = jnp.array([all_bids[i] for i in sub_indices])
-            sub_probs = jax.nn.softmax(sub_bids / temperature)
-
-            for spi, (sub_type, sub_idx) in enumerate(team_program_actions[action_idx]):
-                if sub_type == "operator":
-                    op_probs = op_probs.at[sub_idx].add(
-                        root_probs[pi] * sub_probs[spi])
-                # Deeper routing ignored (2-level approximation)
-
-    return op_probs
+    # Each team's own operator distribution, then the root's: its direct
+    # operators plus, through the teams it routes to, theirs
+    # (deeper routing ignored: 2-level approximation)
+    team_op_probs = jnp.einsum("tp,tpo->to", team_probs, team_program_ops)
+    root_probs = team_probs[0]
+    return team_op_probs[0] + (root_probs @ root_team_routes) @ team_op_probs
 
 
 def band_score(value, center, width):
@@ -249,9 +278,21 @@ def band_score(value, center, width):
     return jnp.maximum(0.0, 1.0 - jnp.abs(value - center) / width)
 
 
-def satisfaction_loss(W, b, diagnostics, verifier_centers, verifier_widths,
-                      verifier_indices, team_program_indices,
-                      team_program_actions, temperature=0.1):
+def trace_satisfaction(diagnostics, verifier_centers, verifier_widths,
+                       verifier_indices):
+    """Mean band score over every diagnostic in the traces and every verifier.
+
+    Depends only on the traces and the spec, not on W or b.
+    """
+    # Band scores of every diagnostic at once: (n_runs, n_gens, n_verifiers)
+    scores = band_score(jnp.take(diagnostics, verifier_indices, axis=-1),
+                        verifier_centers, verifier_widths)
+    return jnp.mean(scores)
+
+
+def satisfaction_loss(W, b, mean_sat, rep_diag, team_program_indices,
+                      team_program_mask, team_program_ops, root_team_routes,
+                      temperature=0.1):
     """Compute negative satisfaction (loss to minimize).
 
     For each diagnostic in the trace:
@@ -268,34 +309,15 @@ def satisfaction_loss(W, b, diagnostics, verifier_centers, verifier_widths,
 
     Simplified approach: maximize band_score of the diagnostics weighted
     by routing entropy (encourage diverse routing = more exploration).
-    """
-    n_runs, n_gens, _ = diagnostics.shape
-
-    total_sat = 0.0
-    count = 0
-
-    for run_idx in range(n_runs):
-        for gen_idx in range(n_gens):
-            diag = diagnostics[run_idx, gen_idx]
-
-            # Band scores for this diagnostic
-            scores = jnp.array([
-                band_score(diag[idx], center, width)
-                for idx, center, width in zip(
-                    verifier_indices, verifier_centers, verifier_widths)
-            ])
-
-            # Mean satisfaction for this diagnostic
-            total_sat = total_sat + jnp.mean(scores)
-            count += 1
-
-    mean_sat = total_sat / max(1, count)
 
+    mean_sat is trace_satisfaction of the traces, which does not change
+    with W and b, so callers compute it once; rep_diag is the
+    representative diagnostic the routing entropy is taken at.
+    """
     # Routing diversity bonus: encourage using multiple operators
-    # (Take one diagnostic as representative)
-    rep_diag = diagnostics[0, 0]
     op_probs = soft_route(W, b, rep_diag, team_program_indices,
-                          team_program_actions, temperature)
+                          team_program_mask, team_program_ops, root_team_routes,
+                          temperature)
     # Entropy of operator distribution (higher = more diverse)
     routing_entropy = -jnp.sum(op_probs * jnp.log(op_probs + 1e-10))
     max_entropy = jnp.log(jnp.array(len(ALL_OPERATORS), dtype=jnp.float32))
@@ -306,53 +328,82 @@ def satisfaction_loss(W, b, diagnostics, verifier_centers, verifier_widths,
     return loss
 
 
+def keep_best(W, b, loss, best):
+    """(W, b, loss) if loss is below best's, else best; branch-free."""
+    best_W, best_b, best_loss = best
+    better = loss < best_loss
+    return (jnp.where(better, W, best_W), jnp.where(better, b, best_b),
+            jnp.where(better, loss, best_loss))
+
+
 def refine_weights(data, config=None):
-    """Main refinement: optimize TPG weights using JAX gradients."""
+    """Main refinement: optimize TPG weights using JAX gradients.
+
+    Gradients are taken against a weight_dtype (default bfloat16) copy of
+    W; the float32 W and b are the optimizer state that gets updated.
+    """
     start = time.time()
 
     config = config or {}
     lr = config.get("learning_rate", 0.01)
     n_steps = config.get("n_steps", 100)
     temperature = config.get("temperature", 0.1)
+    weight_dtype = jnp.dtype(config.get("weight_dtype", "bfloat16"))
 
     # Parse inputs
     W, b, program_info, team_info, tpg_raw = parse_tpg(data)
+    W_orig, b_orig = W, b
     diagnostics = parse_traces(data)
     v_centers, v_widths, v_indices = parse_verifier_spec(data)
 
     # Build routing structure
-    team_prog_indices, team_prog_actions = build_routing_fn(team_info, program_info)
+    team_prog_indices, team_prog_mask, team_prog_ops, root_routes = \
+        build_routing_fn(team_info, program_info)
 
-    # Initial satisfaction
-    initial_loss = float(satisfaction_loss(
-        W, b, diagnostics, v_centers, v_widths, v_indices,
-        team_prog_indices, team_prog_actions, temperature))
+    # The trace satisfaction is fixed; only the routing term depends on
+    # the weights. The entropy is taken at one representative diagnostic
+    mean_sat = trace_satisfaction(diagnostics, v_centers, v_widths, v_indices)
+    rep_diag = diagnostics[0, 0]
 
-    # Gradient function
-    grad_fn = jax.grad(satisfaction_loss, argnums=(0, 1))
+    # Loss and gradient, compiled once: the routing structure and
+    # temperature are Python values, so they are bound rather than traced
+    bound_loss = partial(satisfaction_loss,
+                         team_program_indices=team_prog_indices,
+                         team_program_mask=team_prog_mask,
+                         team_program_ops=team_prog_ops,
+                         root_team_routes=root_routes,
+                         temperature=temperature)
+    loss_and_grad = jax.value_and_grad(bound_loss, argnums=(0, 1))
+
+    def step_fn(carry, _):
+        """One gradient descent step; also folds (W, b) into best.
+
+        Carries (W, b, best) and emits the loss at the W and b passed in.
+        """
+        W, b, best = carry
+        loss, (dW, db) = loss_and_grad(W.astype(weight_dtype), b,
+                                       mean_sat, rep_diag)
+        best = keep_best(W, b, loss, best)
+        return (W - lr * dW.astype(jnp.float32), b - lr * db, best), loss
+
+    # Optimization loop, compiled as one lax.scan. step_fn reports the
+    # loss of the weights it starts from, so losses[0] is the initial
+    # loss, losses[k + 1] is step k's, and the last step's update is
+    # dropped
+    @jit
+    def optimize(W, b):
+        (_, _, best), losses = jax.lax.scan(
+            step_fn, (W, b, (W, b, jnp.float32(jnp.inf))), None,
+            length=n_steps + 1)
+        return best, losses
+
+    (best_W, best_b, best_loss), losses = optimize(W, b)
+    losses = np.asarray(losses).tolist()
+    initial_loss = losses[0]
+    best_loss = float(best_loss)
 
-    # Optimization loop
     trace = []
-    best_W, best_b = W, b
-    best_loss = initial_loss
-
-    for step in range(n_steps):
-        dW, db = grad_fn(W, b, diagnostics, v_centers, v_widths, v_indices,
-                         team_prog_indices, team_prog_actions, temperature)
-
-        # Gradient descent
-        W = W - lr * dW
-        b = b - lr * db
-
-        # Compute current loss
-        current_loss = float(satisfaction_loss(
-            W, b, diagnostics, v_centers, v_widths, v_indices,
-            team_prog_indices, team_prog_actions, temperature))
-
-        if current_loss < best_loss:
-            best_W, best_b = W, b
-            best_loss = current_loss
-
+    for step, current_loss in enumerate(losses[1:]):
         if step % 10 == 0 or step == n_steps - 1:
             trace.append({
                 "step": step,
@@ -378,12 +429,12 @@ def refine_weights(data, config=None):
         }
 
     # Compute operator distribution before and after
-    rep_diag = diagnostics[0, 0]
-    W_orig, b_orig, _, _, _ = parse_tpg(data)
-    orig_op_probs = soft_route(W_orig, b_orig, rep_diag,
-                                team_prog_indices, team_prog_actions, temperature)
-    refined_op_probs = soft_route(W, b, rep_diag,
-                                   team_prog_indices, team_prog_actions, temperature)
+    orig_op_probs = soft_route(W_orig.astype(weight_dtype), b_orig, rep_diag,
+                                team_prog_indices, team_prog_mask,
+                                team_prog_ops, root_routes, temperature)
+    refined_op_probs = soft_route(W.astype(weight_dtype), b, rep_diag,
+                                   team_prog_indices, team_prog_mask,
+                                   team_prog_ops, root_routes, temperature)
 
     orig_dist = {op: round(float(p), 3)
                  for op, p in zip(ALL_OPERATORS, np.array(orig_op_probs))}
@@ -406,6 +457,7 @@ def refine_weights(data, config=None):
             "learning_rate": lr,
             "n_steps": n_steps,
             "temperature": temperature,
+            "weight_dtype": weight_dtype.name,
             "n_runs": int(diagnostics.shape[0]),
             "n_gens": int(diagnostics.shape[1])
         },
@@ -152,7 +152,18 @@ def encode_routing(tpg, dvars, max_depth=4):
     return routes
 
 
-def analyze_reachability(routes, dvars, bounds):
+def make_solver(bounds):
+    """Solver with the diagnostic bounds asserted once.
+
+    The analyses share it, adding each query's constraints inside a
+    push/pop scope, so the bounds are not re-asserted per query.
+    """
+    solver = z3.Solver()
+    solver.add(bounds)
+    return solver
+
+
+def analyze_reachability(routes, dvars, solver):
     """Check which operators are reachable (have satisfiable path conditions)."""
     reachable = {}
     unreachable = []
@@ -170,9 +181,8 @@ def analyze_reachability(routes, dvars, bounds):
             continue
 
         # Check if any route to this operator is satisfiable
-        solver = z3.Solver()
+        solver.push()
         solver.set("timeout", 2000)  # 2s timeout per operator
-        solver.add(bounds)
 
         # Disjunction of all path conditions leading to this operator
         conditions = [cond for cond, _, _ in op_routes[op_id]]
@@ -191,11 +201,12 @@ def analyze_reachability(routes, dvars, bounds):
             }
         else:
             unreachable.append(op_id)
+        solver.pop()
 
     return reachable, unreachable
 
 
-def analyze_dead_programs(tpg, dvars, bounds):
+def analyze_dead_programs(tpg, dvars, solver):
     """Find programs that can never win in their team."""
     dead = []
     team_index = build_team_index(tpg)
@@ -209,9 +220,8 @@ def analyze_dead_programs(tpg, dvars, bounds):
 
         for i, (prog_i, bid_i) in enumerate(bids):
             # Check: is there any diagnostic where prog_i has the highest bid?
-            solver = z3.Solver()
+            solver.push()
             solver.set("timeout", 1000)
-            solver.add(bounds)
 
             # prog_i must beat all others
             for j, (prog_j, bid_j) in enumerate(bids):
@@ -219,6 +229,7 @@ def analyze_dead_programs(tpg, dvars, bounds):
                     solver.add(bid_i > bid_j)  # strict inequality
 
             result = solver.check()
+            solver.pop()
             if result == z3.unsat:
                 dead.append({
                     "team_id": team["team_id"],
@@ -350,7 +361,7 @@ def analyze_coverage_direct(tpg, n_samples=200):
     return coverage
 
 
-def analyze_verifier_satisfiability(tpg, verifier_spec, dvars, bounds, routes):
+def analyze_verifier_satisfiability(tpg, verifier_spec, dvars, solver, routes):
     """Check if there exists a diagnostic where the TPG routes to an operator
     that would satisfy all verifier bands.
 
@@ -360,9 +371,8 @@ def analyze_verifier_satisfiability(tpg, verifier_spec, dvars, bounds, routes):
 
     This is a necessary condition for the TPG to achieve perfect satisfaction.
     """
-    solver = z3.Solver()
+    solver.push()
     solver.set("timeout", 5000)
-    solver.add(bounds)
 
     # Verifier band constraints on the diagnostic itself
     diag_key_to_idx = {k: i for i, k in enumerate(DIAG_KEYS)}
@@ -384,15 +394,18 @@ def analyze_verifier_satisfiability(tpg, verifier_spec, dvars, bounds, routes):
         solver.add(z3.Or(*non_fallback_conditions))
 
     result = solver.check()
+    satisfying = None
     if result == z3.sat:
         model = solver.model()
         satisfying = [float(model.eval(d, model_completion=True).as_fraction())
                       for d in dvars]
-        # Find which operator this diagnostic routes to
-        op = evaluate_tpg_at_point(tpg, satisfying)
-        return True, satisfying, op
-    else:
+    solver.pop()
+
+    if satisfying is None:
         return False, None, None
+    # Find which operator this diagnostic routes to
+    op = evaluate_tpg_at_point(tpg, satisfying)
+    return True, satisfying, op
 
 
 def analyze_operator_regions(routes, dvars, bounds):
@@ -472,22 +485,23 @@ def analyze(data):
 
     # Create diagnostic variables
     dvars, bounds = make_diagnostic_vars()
+    solver = make_solver(bounds)
 
     # Encode routing
     routes = encode_routing(tpg, dvars)
 
     # 1. Reachability
-    reachable, unreachable = analyze_reachability(routes, dvars, bounds)
+    reachable, unreachable = analyze_reachability(routes, dvars, solver)
 
     # 2. Dead programs
-    dead = analyze_dead_programs(tpg, dvars, bounds)
+    dead = analyze_dead_programs(tpg, dvars, solver)
 
     # 3. Coverage estimation (direct evaluation, faster than Z3)
     coverage = analyze_coverage_direct(tpg, n_samples=500)
 
     # 4. Verifier satisfiability
     sat, sat_diag, sat_op = analyze_verifier_satisfiability(
-        tpg, verifier_spec, dvars, bounds, routes)
+        tpg, verifier_spec, dvars, solver, routes)
 
     # 5. Operator region info
     regions = analyze_operator_regions(routes, dvars, bounds)